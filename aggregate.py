@@ -0,0 +1,242 @@
+"""
+Aggregates many per-seed runs of the same scenario into a compact summary.
+
+Runs are streamed in chunks, so memory stays bounded by the number of timesteps, not by the number of runs:
+- per-timestep mean and standard deviation are computed online (Welford)
+- per-timestep quantiles are estimated online (P-square)
+- survival time of the colony (first timestep without alive bees) is collected per run
+
+Usage:
+    python aggregate.py <summary.csv> <run1.csv> [<run2.csv> ...]
+
+Writes <summary.csv> (one row per timestep) and <summary>_survival.json.
+"""
+import json
+import os
+import sys
+
+import numpy as np
+
+TIMESTEP_COLUMN = "timestep"
+SURVIVAL_COLUMN = "alive_queen1"
+QUANTILES = (0.05, 0.5, 0.95)
+CHUNK_SIZE = 10_000
+
+
+class Welford:
+    """Running count, mean and variance for each timestep."""
+
+    def __init__(self, capacity: int):
+        self.count = np.zeros(capacity, dtype=np.int64)
+        self.mean = np.zeros(capacity)
+        self.m2 = np.zeros(capacity)
+
+    def grow(self, capacity: int):
+        self.count = _grow(self.count, capacity)
+        self.mean = _grow(self.mean, capacity)
+        self.m2 = _grow(self.m2, capacity)
+
+    def update(self, index: np.ndarray, x: np.ndarray):
+        """Adds one observation for each (distinct) index."""
+        self.count[index] += 1
+        delta = x - self.mean[index]
+        self.mean[index] += delta / self.count[index]
+        self.m2[index] += delta * (x - self.mean[index])
+
+    def std(self) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.count > 1, np.sqrt(self.m2 / (self.count - 1)), 0.0)
+
+
+class P2Quantile:
+    """
+    P-square estimator of the p-quantile for each timestep (Jain & Chlamtac, 1985).
+    Keeps 5 markers per timestep; the first 5 observations are kept exactly.
+    """
+
+    def __init__(self, p: float, capacity: int):
+        self.p = p
+        self.count = np.zeros(capacity, dtype=np.int64)
+        self.heights = np.zeros((capacity, 5))
+        self.positions = np.tile(np.arange(1, 6, dtype=float), (capacity, 1))
+        self.desired = np.tile(np.array([1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]), (capacity, 1))
+        self.increments = np.array([0, p / 2, p, (1 + p) / 2, 1])
+
+    def grow(self, capacity: int):
+        old = self.count.size
+        self.count = _grow(self.count, capacity)
+        self.heights = _grow(self.heights, capacity)
+        self.positions = _grow(self.positions, capacity)
+        self.desired = _grow(self.desired, capacity)
+        self.positions[old:] = np.arange(1, 6)
+        self.desired[old:] = [1, 1 + 2 * self.p, 1 + 4 * self.p, 3 + 2 * self.p, 5]
+
+    def update(self, index: np.ndarray, x: np.ndarray):
+        """Adds one observation for each (distinct) index."""
+        count = self.count[index]
+
+        # warm up: store the first 5 observations, sorted once the 5th arrives
+        warming = count < 5
+        if warming.any():
+            w_index = index[warming]
+            self.heights[w_index, count[warming]] = x[warming]
+            full = w_index[count[warming] == 4]
+            self.heights[full] = np.sort(self.heights[full], axis=1)
+        self.count[index] += 1
+
+        index, x = index[~warming], x[~warming]
+        if index.size == 0:
+            return
+        q = self.heights[index]
+        n = self.positions[index]
+
+        # find the cell of x, adjusting the extreme markers
+        q[:, 0] = np.minimum(q[:, 0], x)
+        q[:, 4] = np.maximum(q[:, 4], x)
+        k = np.clip((q[:, :4] <= x[:, None]).sum(axis=1) - 1, 0, 3)
+        n += np.arange(5)[None, :] > k[:, None]
+        desired = self.desired[index] + self.increments
+
+        # adjust the middle markers
+        for i in range(1, 4):
+            d = desired[:, i] - n[:, i]
+            move = ((d >= 1) & (n[:, i + 1] - n[:, i] > 1)) | ((d <= -1) & (n[:, i - 1] - n[:, i] < -1))
+            if not move.any():
+                continue
+            d = np.sign(d[move])
+            qm, qi, qp = q[move, i - 1], q[move, i], q[move, i + 1]
+            nm, ni, np_ = n[move, i - 1], n[move, i], n[move, i + 1]
+            parabolic = qi + d / (np_ - nm) * ((ni - nm + d) * (qp - qi) / (np_ - ni) + (np_ - ni - d) * (qi - qm) / (ni - nm))
+            linear = np.where(d > 0, qi + (qp - qi) / (np_ - ni), qi - (qm - qi) / (nm - ni))
+            q[move, i] = np.where((qm < parabolic) & (parabolic < qp), parabolic, linear)
+            n[move, i] += d
+
+        self.heights[index] = q
+        self.positions[index] = n
+        self.desired[index] = desired
+
+    def estimate(self) -> np.ndarray:
+        estimate = self.heights[:, 2].copy()
+        for c in range(1, 5):
+            warming = np.flatnonzero(self.count == c)
+            if warming.size:
+                estimate[warming] = np.quantile(self.heights[warming, :c], self.p, axis=1)
+        estimate[self.count == 0] = np.nan
+        return estimate
+
+
+class ScenarioAggregator:
+    """Streams per-seed runs of one scenario and summarises them per timestep."""
+
+    def __init__(self, quantiles=QUANTILES, capacity: int = 1024):
+        self.quantiles = quantiles
+        self.capacity = capacity
+        self.metrics: list[str] = None
+        self.stats: dict[str, Welford] = {}
+        self.quantile_stats: dict[str, list[P2Quantile]] = {}
+        self.n_runs = 0
+        self.survival_times: list[int] = []
+        self.survived = 0
+
+    def add_run(self, path: str, chunk_size: int = CHUNK_SIZE):
+        import pandas as pd
+
+        collapse = None
+        last_timestep = 0
+        for chunk in pd.read_csv(path, chunksize=chunk_size):
+            if self.metrics is None:
+                self.__init_metrics([column for column in chunk.columns if column != TIMESTEP_COLUMN])
+            timesteps = chunk[TIMESTEP_COLUMN].to_numpy(dtype=np.int64)
+            if timesteps.size == 0:
+                continue
+            self.__ensure_capacity(int(timesteps.max()) + 1)
+            for metric in self.metrics:
+                values = chunk[metric].to_numpy(dtype=float)
+                self.stats[metric].update(timesteps, values)
+                for estimator in self.quantile_stats[metric]:
+                    estimator.update(timesteps, values)
+            last_timestep = max(last_timestep, int(timesteps.max()))
+            if collapse is None and SURVIVAL_COLUMN in chunk:
+                dead = np.flatnonzero(chunk[SURVIVAL_COLUMN].to_numpy() <= 0)
+                if dead.size:
+                    collapse = int(timesteps[dead[0]])
+
+        self.n_runs += 1
+        if collapse is None:
+            self.survived += 1  # censored at the end of the run
+            self.survival_times.append(last_timestep)
+        else:
+            self.survival_times.append(collapse)
+
+    def summary(self):
+        import pandas as pd
+
+        observed = np.flatnonzero(self.stats[self.metrics[0]].count > 0) if self.metrics else np.array([], dtype=int)
+        columns = {TIMESTEP_COLUMN: observed, "runs": self.stats[self.metrics[0]].count[observed] if self.metrics else []}
+        for metric in self.metrics or []:
+            columns[f"{metric}_mean"] = self.stats[metric].mean[observed]
+            columns[f"{metric}_std"] = self.stats[metric].std()[observed]
+            for p, estimator in zip(self.quantiles, self.quantile_stats[metric]):
+                columns[f"{metric}_{quantile_label(p)}"] = estimator.estimate()[observed]
+        return pd.DataFrame(columns)
+
+    def survival(self) -> dict:
+        times = np.array(self.survival_times, dtype=float)
+        return {
+            "runs": self.n_runs,
+            "survived": self.survived,
+            "mean": float(times.mean()) if times.size else None,
+            "std": float(times.std(ddof=1)) if times.size > 1 else 0.0,
+            **{quantile_label(p): float(np.quantile(times, p)) if times.size else None for p in self.quantiles},
+        }
+
+    def write(self, summary_path: str):
+        self.summary().to_csv(summary_path, index=False)
+        with open(survival_path(summary_path), "w") as file:
+            json.dump(self.survival(), file, indent=4)
+
+    def __init_metrics(self, metrics: list[str]):
+        self.metrics = metrics
+        for metric in metrics:
+            self.stats[metric] = Welford(self.capacity)
+            self.quantile_stats[metric] = [P2Quantile(p, self.capacity) for p in self.quantiles]
+
+    def __ensure_capacity(self, needed: int):
+        if needed <= self.capacity:
+            return
+        while self.capacity < needed:
+            self.capacity *= 2
+        for metric in self.metrics:
+            self.stats[metric].grow(self.capacity)
+            for estimator in self.quantile_stats[metric]:
+                estimator.grow(self.capacity)
+
+
+def quantile_label(p: float) -> str:
+    return f"q{round(p * 100):02d}"
+
+
+def survival_path(summary_path: str) -> str:
+    return f"{os.path.splitext(summary_path)[0]}_survival.json"
+
+
+def aggregate(run_paths: list[str], summary_path: str, chunk_size: int = CHUNK_SIZE) -> ScenarioAggregator:
+    aggregator = ScenarioAggregator()
+    for path in run_paths:
+        aggregator.add_run(path, chunk_size)
+    aggregator.write(summary_path)
+    return aggregator
+
+
+def _grow(array: np.ndarray, capacity: int) -> np.ndarray:
+    grown = np.zeros((capacity, *array.shape[1:]), dtype=array.dtype)
+    grown[:array.shape[0]] = array
+    return grown
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        aggregate(sys.argv[2:], sys.argv[1])
+    else:
+        print("Usage: python aggregate.py <summary.csv> <run1.csv> [<run2.csv> ...]")
+        sys.exit(1)
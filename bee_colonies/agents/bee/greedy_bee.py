@@ -1,13 +1,15 @@
 import numpy as np
 from bee_colonies.models.bee import Bee, BEE_STAY, BEE_UP, BEE_DOWN, BEE_LEFT, BEE_RIGHT, BEE_ATTACK, BEE_PICK, \
-    BEE_DROP, BEE_N_ACTIONS, move_away, move_towards
+    BEE_DROP, BEE_N_ACTIONS, move_away
 from bee_colonies.models.agent import apply_mask_to_action, manhattan_distance
-
+from config import Config
 
 
 class GreedyBee(Bee):
-    def __init__(self, local_beehive_id):
-        super().__init__(local_beehive_id)
+    __slots__ = ()
+
+    def __init__(self, local_beehive_id, config: Config = None):
+        super().__init__(local_beehive_id, config)
 
     def action(self) -> int:
         """
@@ -29,20 +31,21 @@ class GreedyBee(Bee):
         if self.pollen:
             if position == self.beehive_location:
                 return apply_mask_to_action(BEE_DROP, self.mask)
-            return apply_mask_to_action(move_towards(position, self.beehive_location), self.mask)
+            return apply_mask_to_action(self.move_home(position), self.mask)
         
         visible_flowers = self.last_observation["flowers"]
         if len(visible_flowers) == 0:
             return apply_mask_to_action(move_away(position, self.beehive_location), self.mask)
         
-        visible_flowers.sort(key=lambda x: manhattan_distance(position, x.position))
+        # the observation is shared with the bees at the same cell: sort a copy
+        visible_flowers = sorted(visible_flowers, key=lambda x: manhattan_distance(position, x.position))
         
         for f in visible_flowers:
             if f.pollen:
                 # if bee on flower
                 if position == f.position:
                     return apply_mask_to_action(BEE_PICK, self.mask)
-                return apply_mask_to_action(move_towards(position, f.position), self.mask)
+                return apply_mask_to_action(self.move_to(position, f.position), self.mask)
             
         return apply_mask_to_action(move_away(position, self.beehive_location), self.mask)
 
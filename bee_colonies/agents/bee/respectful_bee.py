@@ -1,19 +1,22 @@
 from bee_colonies.models.agent import apply_mask_to_action, manhattan_distance
 from bee_colonies.models.bee import BEE_ATTACK, BEE_N_ACTIONS, BEE_STAY, Bee, BEE_UP, BEE_DOWN, BEE_LEFT, BEE_RIGHT, \
-    BEE_DROP, BEE_PICK, move_towards
+    BEE_DROP, BEE_PICK
 import numpy as np
 
 from bee_colonies.models.searching_guide import SearchingGuide
-from config import get_config
-
-CONFIG = get_config()
-RANDOM_WALK_INTENT = CONFIG["random_walk_intent"]
+from config import Config
 
 
 class RespectfulBee(Bee):
-    def __init__(self, local_beehive_id):
-        super().__init__(local_beehive_id)
-        self.searching_guide = SearchingGuide([BEE_UP, BEE_DOWN, BEE_LEFT, BEE_RIGHT], RANDOM_WALK_INTENT)
+    __slots__ = ("searching_guide",)
+
+    def __init__(self, local_beehive_id, config: Config = None):
+        super().__init__(local_beehive_id, config)
+        self.searching_guide = SearchingGuide([BEE_UP, BEE_DOWN, BEE_LEFT, BEE_RIGHT], self.config.random_walk_intent)
+
+    def reset(self):
+        super().reset()
+        self.searching_guide.reset()
 
     def action(self) -> int:
         if not self.is_alive:
@@ -32,16 +35,20 @@ class RespectfulBee(Bee):
         if self.pollen:
             if position == self.beehive_location:
                 return apply_mask_to_action(BEE_DROP, self.mask)
-            return apply_mask_to_action(move_towards(position, self.beehive_location), self.mask)
+            return apply_mask_to_action(self.move_home(position), self.mask)
 
-        # Find the closest flower that this bee can claim
-        flower, can_claim = self._find_flower_to_claim(self.last_observation)
+        # Find the closest flower that this bee can claim, assigned colony-wide once per step
+        if self.queen.flower_claims.ready:
+            flower = self.queen.flower_claims.assigned_flower(self.local_beehive_id)
+        else:
+            flower, can_claim = self._find_flower_to_claim(self.last_observation)
+            flower = flower if can_claim else None
 
-        if can_claim and flower:
+        if flower:
             if position == flower.position:
                 return apply_mask_to_action(BEE_PICK, self.mask)
             # If a flower is claimable, determine the move to get there
-            return apply_mask_to_action(move_towards(self.last_observation["position"], flower.position), self.mask)
+            return apply_mask_to_action(self.move_to(self.last_observation["position"], flower.position), self.mask)
         else:
             # Continue searching randomly or perform other behaviors
             return apply_mask_to_action(self.searching_guide.walk(self.last_observation["position"]), self.mask)
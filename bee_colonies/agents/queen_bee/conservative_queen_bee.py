@@ -2,12 +2,15 @@ import numpy as np
 
 from bee_colonies.models.agent import apply_mask_to_action
 from bee_colonies.models.bee import Bee
-from bee_colonies.models.queen_bee import QueenBee, HEALTH_SCORE_FUNCTION, IS_GOOD_HEALTH
+from bee_colonies.models.queen_bee import QueenBee, HEALTH_SCORE_FUNCTION
+from config import Config
 
 
 class ConservativeQueenBee(QueenBee):
-    def __init__(self, id: int, bees: list[Bee], new_bee_class):
-        super().__init__(id, bees, new_bee_class)
+    __slots__ = ()
+
+    def __init__(self, id: int, bees: list[Bee], new_bee_class, config: Config = None):
+        super().__init__(id, bees, new_bee_class, config)
 
     def action(self) -> np.ndarray:
         """
@@ -22,7 +25,7 @@ class ConservativeQueenBee(QueenBee):
         if len(nearby_wasps) != 0:
             return apply_mask_to_action(np.ones(self.action_space.n, dtype=np.int8), self.mask)
         health_score = HEALTH_SCORE_FUNCTION(self.food_quantity, self.alive_bees)
-        if IS_GOOD_HEALTH(health_score):
+        if self.is_good_health(health_score):
             return apply_mask_to_action(np.ones(self.action_space.n, dtype=np.int8), self.mask)
         # choose one present bee
         picked_index = self.presence_array.argmax()
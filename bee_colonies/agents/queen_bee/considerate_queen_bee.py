@@ -4,19 +4,16 @@ from copy import copy
 import numpy as np
 
 from bee_colonies.models.agent import apply_mask_to_action
-from bee_colonies.models.queen_bee import QueenBee, HEALTH_SCORE_FUNCTION, IS_GOOD_HEALTH, IS_BAD_HEALTH
+from bee_colonies.models.queen_bee import QueenBee, HEALTH_SCORE_FUNCTION
 from bee_colonies.models.bee import Bee
-from config import get_config
-
-CONFIG = get_config()
-KEEP_RATIO_GOOD_HEALTH = CONFIG["keep_ratio_good_health"]
-KEEP_RATIO_OK_HEALTH = CONFIG["keep_ratio_ok_health"]
-KEEP_RATIO_BAD_HEALTH = CONFIG["keep_ratio_bad_health"]
+from config import Config
 
 
 class ConsiderateQueenBee(QueenBee):
-    def __init__(self, id: int, bees: list[Bee], new_bee_class):
-        super().__init__(id, bees, new_bee_class)
+    __slots__ = ()
+
+    def __init__(self, id: int, bees: list[Bee], new_bee_class, config: Config = None):
+        super().__init__(id, bees, new_bee_class, config)
 
     def action(self) -> np.ndarray:
         """
@@ -32,12 +29,12 @@ class ConsiderateQueenBee(QueenBee):
         if len(nearby_wasps) != 0:
             return apply_mask_to_action(np.ones(self.action_space.n, dtype=np.int8), self.mask)
         health_score = HEALTH_SCORE_FUNCTION(self.food_quantity, self.alive_bees)
-        if IS_GOOD_HEALTH(health_score):
-            return apply_mask_to_action(self.__keep_at_least(KEEP_RATIO_GOOD_HEALTH), self.mask)
-        elif IS_BAD_HEALTH(health_score):
-            return apply_mask_to_action(self.__keep_at_least(KEEP_RATIO_BAD_HEALTH), self.mask)
+        if self.is_good_health(health_score):
+            return apply_mask_to_action(self.__keep_at_least(self.config.keep_ratio_good_health), self.mask)
+        elif self.is_bad_health(health_score):
+            return apply_mask_to_action(self.__keep_at_least(self.config.keep_ratio_bad_health), self.mask)
         else:
-            return apply_mask_to_action(self.__keep_at_least(KEEP_RATIO_OK_HEALTH), self.mask)
+            return apply_mask_to_action(self.__keep_at_least(self.config.keep_ratio_ok_health), self.mask)
 
     def __keep_at_least(self, x: int):
         action = copy(self.presence_array)
@@ -3,11 +3,14 @@ import numpy as np
 from bee_colonies.models.agent import apply_mask_to_action
 from bee_colonies.models.queen_bee import QueenBee
 from bee_colonies.models.bee import Bee
+from config import Config
 
 
 class GreedyQueenBee(QueenBee):
-    def __init__(self, id: int, bees: list[Bee], new_bee_class):
-        super().__init__(id, bees, new_bee_class)
+    __slots__ = ()
+
+    def __init__(self, id: int, bees: list[Bee], new_bee_class, config: Config = None):
+        super().__init__(id, bees, new_bee_class, config)
 
     def action(self) -> np.ndarray:
         """
@@ -1,17 +1,20 @@
 from bee_colonies.env.bee_colonies import WASP_DOWN, WASP_UP, WASP_RIGHT, WASP_LEFT, WASP_STAY
 from bee_colonies.models.agent import apply_mask_to_action, manhattan_distance
-from bee_colonies.models.wasp import WASP_ATTACK, Wasp, move_towards
+from bee_colonies.models.wasp import WASP_ATTACK, Wasp
 from bee_colonies.models.searching_guide import SearchingGuide
-from config import get_config
-
-CONFIG = get_config()
-RANDOM_WALK_INTENT = CONFIG["random_walk_intent"]
+from config import Config
 
 
 class GreedyWasp(Wasp):
-    def __init__(self, id):
-        super().__init__(id)
-        self.searching_guide = SearchingGuide([WASP_UP, WASP_DOWN, WASP_LEFT, WASP_RIGHT], RANDOM_WALK_INTENT)
+    __slots__ = ("searching_guide",)
+
+    def __init__(self, id, config: Config = None):
+        super().__init__(id, config)
+        self.searching_guide = SearchingGuide([WASP_UP, WASP_DOWN, WASP_LEFT, WASP_RIGHT], self.config.random_walk_intent)
+
+    def reset(self):
+        super().reset()
+        self.searching_guide.reset()
     
     def action(self) -> int:
         # If the wasp can see a beehive, it will choose an action to move towards or attack the beehive
@@ -24,7 +27,7 @@ class GreedyWasp(Wasp):
         if beehive_location:
             if position == beehive_location:
                 return apply_mask_to_action(WASP_ATTACK, self.mask)
-            return apply_mask_to_action(move_towards(position, beehive_location), self.mask)
+            return apply_mask_to_action(self.move_to(position, beehive_location), self.mask)
 
         else:
             # Move randomly if no beehive is visible
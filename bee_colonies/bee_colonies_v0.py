@@ -0,0 +1,6 @@
+from bee_colonies.env.bee_colonies import parallel_env_class
+
+
+def parallel_env(*args, **kwargs):
+    """pettingzoo entry point, takes the same arguments as BeeColonyEnv."""
+    return parallel_env_class()(*args, **kwargs)
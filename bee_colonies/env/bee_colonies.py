@@ -1,12 +1,14 @@
 import random
 from copy import copy
+from functools import lru_cache
 from os import environ
+from types import MappingProxyType
 
 import numpy as np
 
-from pettingzoo import ParallelEnv
-
-from bee_colonies.models.flower import Flower, generate_flowers, generate_uniform_flowers
+from bee_colonies.env.rewards import StepEvents, colony_healths, compute_rewards
+from bee_colonies.models.flower import Flower, RegrowthScheduler, generate_flowers, generate_uniform_flowers
+from bee_colonies.models.layout import Layout, load_layout
 
 from bee_colonies.models.queen_bee import HEALTH_SCORE_FUNCTION, QueenBee
 from bee_colonies.models.bee import Bee, BEE_STAY, BEE_UP, BEE_DOWN, BEE_LEFT, BEE_RIGHT, BEE_ATTACK, BEE_PICK, \
@@ -14,13 +16,11 @@ from bee_colonies.models.bee import Bee, BEE_STAY, BEE_UP, BEE_DOWN, BEE_LEFT, B
 from bee_colonies.models.wasp import Wasp, WASP_STAY, WASP_UP, WASP_DOWN, WASP_LEFT, WASP_RIGHT, WASP_ATTACK, \
     WASP_N_ACTIONS
 from bee_colonies.models.agent import Agent, manhattan_distance
-from bee_colonies.models.grid import Grid
-from config import get_config
-
-CONFIG = get_config()
-QUEEN_BEE_VISION_MULTIPLIER = CONFIG["queen_bee_vision_multiplier"]
-BEE_VISION_MULTIPLIER = CONFIG["bee_vision_multiplier"]
-WASP_VISION_MULTIPLIER = CONFIG["wasp_vision_multiplier"]
+from bee_colonies.models.navigation import FlowFields, manhattan_distances
+from bee_colonies.models.roster import put_in_slot
+from bee_colonies.models.terrain import Terrain, load_terrain
+from bee_colonies.models.world import BEEHIVES, BEES, FLOWERS, WASPS, ChunkedWorld
+from config import Config, get_config
 
 
 def configure_seed(seed):
@@ -33,15 +33,35 @@ def configure_seed(seed):
 
 Coord = tuple[int, int]
 
+# observation of dead agents, and (with their position) of dormant bees; read-only, as every dead agent shares it
+EMPTY_OBSERVATION = MappingProxyType({
+    "position": None,
+    "beehives": (),
+    "flowers": (),
+    "bees": (),
+    "wasps": (),
+})
+
 
-class BeeColonyEnv(ParallelEnv):
+# per-colony metrics the infos can hold, in the order they appear
+INFO_METRICS = {
+    "alive": lambda queen: queen.alive_bees,
+    "dead_count": lambda queen: queen.dead_count,
+    "food": lambda queen: queen.food_quantity,
+    "health": lambda queen: HEALTH_SCORE_FUNCTION(queen.food_quantity, queen.alive_bees),
+    "health_tendency_counter": lambda queen: queen.health_tendency_counter,
+    "presence_in_beehive": lambda queen: queen.roster.present,
+}
+
+
+class BeeColonyEnv:
     metadata = {
         "name": "custom_environment_v0",
     }
 
     def __init__(self, queen_bees: list[QueenBee], bees: tuple[list[Bee], ...], wasps: list[Wasp], seed=None,
                  grid_shape=(64, 64), n_bees_per_colony=(10,), flower_density=0.5, n_wasps=1, range_of_vision=2,
-                 num_clusters=2, max_distance_from_cluster=5, section_size=5, max_steps=1000):
+                 num_clusters=2, max_distance_from_cluster=5, section_size=5, max_steps=1000, config: Config = None):
         """
         The init method takes in environment arguments.
 
@@ -58,9 +78,12 @@ class BeeColonyEnv(ParallelEnv):
         - n_bees_per_colony: (10,) (number of bees per colony)
         - flower_density: 0.5 (probability of a flower being present in a cell)
         - max_steps: 1000
+        - config: get_config() (tunables of this environment instance)
         """
+        self.config = config or get_config()
         self.seed = seed
         configure_seed(self.seed)
+        self.np_random = np.random.default_rng(self.seed)
 
         # Sizes
         self._grid_shape = grid_shape
@@ -89,14 +112,42 @@ class BeeColonyEnv(ParallelEnv):
         self.init_wasps = wasps
 
         self.flowers: dict[Coord, Flower] = None
+        self._regrowth: RegrowthScheduler = None
+        self.terrain: Terrain = None  # None: open field
+        self.layout: Layout = None  # None: flowers generated at reset
+        # directions towards each beehive, shared with bees and wasps
+        self.flow_fields = FlowFields()
+        self.world: ChunkedWorld = None  # what occupies each chunk of the grid, for observations
+        self._flower_list: list[Flower] = None
+        # views of the world shared by the agents observing from the same cell with the same radius; a view is
+        # kept from one step to the next until something visible in it changes
+        self._shared_views: dict[tuple[Coord, int], dict] = {}
+        self._previous_views: dict[tuple[Coord, int], dict] = {}  # views of the last step still up to date
+        # flowers never move: the flowers of a view are kept as long as some agent looks through it
+        self._flower_views: dict[tuple[Coord, int], tuple] = {}
+        # what the bees, wasps and beehives layers of the world hold, to find what changed since the last step
+        self._placed_bees: dict[tuple[int, int], Coord] = {}
+        self._moved_bees: set[tuple[int, int]] = set()  # (colony, slot) of the bees whose cell changed since then
+        self._changed: ChunkedWorld = None  # cells whose content changed during the last step
+        self._placed_wasps: list[tuple[Coord, bool]] = []
+        self._placed_hives: list[bool] = []
+        # bees held in their hive with nothing to attack: they are neither observed nor asked for an action
+        self.dormant: set[Bee] = set()
+        self._events: StepEvents = None  # what happened during the current step, for rewards
 
         self.timestep: int = None
+        # metrics reported in the infos of each step, all of them by default
+        info_metrics = self.config.info_metrics
+        unknown = set(info_metrics or ()) - set(INFO_METRICS)
+        if unknown:
+            raise ValueError(f"Unknown info metrics: {', '.join(sorted(unknown))}")
+        self._info_metrics = [name for name in INFO_METRICS if info_metrics is None or name in info_metrics]
         self._flower_density = flower_density
         self._num_clusters = num_clusters
         self._max_distance_from_cluster = max_distance_from_cluster
         self._section_size = section_size
         self._max_steps = max_steps
-        self._grid = Grid(*self._grid_shape)
+        self._grid = None  # created on the first render(), so pygame is only loaded when rendering
 
     def reset(self) -> tuple[list, tuple[list], list]:
         """
@@ -115,13 +166,29 @@ class BeeColonyEnv(ParallelEnv):
         And must set up the environment so that render(), step(), and observe() can be called without issues.
         """
 
+        # agents are reset in place: a reset environment can run another episode with the same objects
         self.queen_bees: list[QueenBee] = copy(self.init_queen_bees)
         self.bees_by_colony: tuple[list[Bee], ...] = copy(self.init_bees)
         self.wasps: list[Wasp] = copy(self.init_wasps)
+        for queen_bee in self.queen_bees:
+            queen_bee.reset(self._n_bees_per_colony[queen_bee.id])
+        for wasp in self.wasps:
+            wasp.reset()
         self.timestep: int = 0
+        self.dormant = set()
         clusters = tuple()
-
-        if self._num_clusters == 0:
+        if self.config.terrain_path:
+            self.terrain = load_terrain(self.config.terrain_path, self._grid_shape)
+
+        if self.config.layout_path:
+            self.layout = load_layout(self.config.layout_path)
+            if tuple(self.layout.grid_shape) != tuple(self._grid_shape):
+                raise ValueError(
+                    f"Layout {self.config.layout_path} is {self.layout.grid_shape}, not {self._grid_shape}"
+                )
+            clusters = tuple(self.layout.clusters)
+            self.flower_coordinates = self.layout.flower_coordinates()
+        elif self._num_clusters == 0:
             self.flower_coordinates = generate_uniform_flowers(self._grid_shape, self._flower_density)
         else:
             clusters = tuple(
@@ -129,11 +196,16 @@ class BeeColonyEnv(ParallelEnv):
                 for _ in range(self._num_clusters)
             )
 
-            self.flower_coordinates = generate_flowers(self._grid_shape, self._flower_density, clusters)
+            self.flower_coordinates = generate_flowers(self._grid_shape, self._flower_density, clusters,
+                                                       self.config.spread_divider, self.config.spread_scale)
+        if self.terrain is not None:
+            self.flower_coordinates = [coord for coord in self.flower_coordinates if self.terrain.is_passable(coord)]
 
         self.flowers = {
-            flower_coord: Flower(flower_coord) for flower_coord in self.flower_coordinates
+            flower_coord: Flower(flower_coord, self.config.time_to_restore_pollen)
+            for flower_coord in self.flower_coordinates
         }
+        self._regrowth = RegrowthScheduler(self.__tick())
 
         self.beehive_coordinates = []
 
@@ -149,9 +221,11 @@ class BeeColonyEnv(ParallelEnv):
             self.__assign_wasp_start_location() for _ in range(self._n_wasps)
         ]
 
+        self.flow_fields.reset(self._grid_shape, self.beehive_coordinates, self.terrain)
+
         for queen_bee in self.queen_bees:
             queen_bee.set_spawn(self.beehive_coordinates[queen_bee.id])
-            queen_bee.presence_array = np.ones(self._n_bees_per_colony[queen_bee.id])
+            queen_bee.flow_fields = self.flow_fields
 
         for colony in self.bees_by_colony:
             for bee in colony:
@@ -159,43 +233,53 @@ class BeeColonyEnv(ParallelEnv):
 
         for wasp in self.wasps:
             wasp.set_spawn(self.wasp_coordinates[wasp.id])
+            wasp.flow_fields = self.flow_fields
 
+        self._flower_list = list(self.flowers.values())
+        self.world = ChunkedWorld(self._grid_shape, self.config.world_chunk_size)
+        self.world.fill(FLOWERS, enumerate(self.flowers))
+        self.world.fill(BEEHIVES, enumerate(self.beehive_coordinates))
         for queen_bee in self.queen_bees:
-            for section in self.__get_all_sections():
-                queen_bee.pursuing_flower_map[section] = set()
-                queen_bee.section_size = self._section_size
-
+            queen_bee.flower_claims.reset(self._flower_list, self.vision_radius(Bee), self.world)
+        self._shared_views, self._previous_views, self._flower_views = {}, {}, {}
+        self._placed_bees, self._placed_wasps, self._placed_hives = {}, [], []
+        self._moved_bees = {
+            (colony, i) for colony, colony_coords in enumerate(self.bee_coordinates) for i in range(len(colony_coords))
+        }
+        self._changed = ChunkedWorld(self._grid_shape, self.config.world_chunk_size)
+        self.world.clear(BEES)
+        self.world.clear(WASPS)
 
         # Observation
-        observations = (
-            [self.__observation(agent) for agent in self.queen_bees],
-            tuple(
-                [self.__observation(bee) for bee in colony] for colony in self.bees_by_colony
-            ),
-            [self.__observation(agent) for agent in self.wasps]
-        )
+        observations = self.__observe_all()
+        self.__snapshot_colonies()
 
         return observations
 
     def step(self, actions: dict[Agent, int]):
         self.timestep += 1
-        # TODO: rewards
-        rewards = None
-        for flower in self.flowers.values():
-            flower.timestep()
+        colony_sizes = [len(colony) for colony in self.bees_by_colony]
+        self._events = StepEvents(colony_sizes, len(self.wasps))
+        alive_before = [np.zeros(size + 1, dtype=bool) for size in colony_sizes]
+        for colony, queen_bee in enumerate(self.queen_bees):
+            alive_before[colony][:colony_sizes[colony]] = queen_bee.roster.alive
+        health_before = colony_healths(self.queen_bees)
+        self._regrowth.advance_to(self.__tick())
         # Execute actions
         for agent, action in actions.items():
             if agent.is_alive:
                 self.__update_agent(agent, action)
 
-        for flower in self.flowers.values():
-            flower.timestep()
+        self._regrowth.advance_to(self.__tick(after_actions=True))
 
         # Generate action masks
         # all can do all
         # go through each and exclude non-possible actions
         # bee and queen
         masks = self.permissive_masks()
+        move_masks = self.terrain.move_masks() if self.terrain is not None else None
+        alive_wasp_cells = {self.wasp_coordinates[wasp.id] for wasp in self.wasps if wasp.is_alive}
+        self.dormant = set()
 
         for queen_bee in self.queen_bees:
             for i, presence in enumerate(queen_bee.presence_array):
@@ -205,10 +289,12 @@ class BeeColonyEnv(ParallelEnv):
             for bee in colony_bees:
                 if not bee.is_alive:
                     # hack: put them in their beehive if they're dead
-                    self.bee_coordinates[colony][bee.local_beehive_id] = bee.beehive_location
+                    self.__move_bee(colony, bee.local_beehive_id, bee.beehive_location)
                     continue
                 position: Coord = self.bee_coordinates[colony][bee.local_beehive_id]
-                if position not in self.flower_coordinates:
+                if move_masks is not None:
+                    masks[1][colony][bee.local_beehive_id][:BEE_ATTACK] *= move_masks[position]
+                if position not in self.flowers:
                     masks[1][colony][bee.local_beehive_id][BEE_PICK] = 0
                 wasp_at_position = self.__wasp_at_position(position)
                 if wasp_at_position is None or not self.wasps[wasp_at_position].is_alive:
@@ -219,7 +305,7 @@ class BeeColonyEnv(ParallelEnv):
                     #     masks[1][colony][bee.local_beehive_id][BEE_ATTACK] = 1
                     #     continue
                     if bee.pollen:
-                        self.queen_bees[bee.queen_id].presence_array[bee.local_beehive_id] = 1
+                        self.queen_bees[bee.queen_id].roster.arrive(bee.local_beehive_id)
                         masks[1][colony][bee.local_beehive_id] = np.zeros(bee.action_space.n, dtype=np.int8)
                         masks[1][colony][bee.local_beehive_id][BEE_DROP] = 1
                     else:
@@ -228,6 +314,9 @@ class BeeColonyEnv(ParallelEnv):
                             masks[1][colony][bee.local_beehive_id] = np.zeros(bee.action_space.n, dtype=np.int8)
                             masks[1][colony][bee.local_beehive_id][BEE_STAY] = 1
                             masks[1][colony][bee.local_beehive_id][BEE_ATTACK] = 1
+                            if position not in alive_wasp_cells:
+                                # nothing to attack either: every possible action is a no-op
+                                self.dormant.add(bee)
                         else:
                             # needs to move out of the beehive
                             masks[1][colony][bee.local_beehive_id][BEE_STAY] = 0
@@ -236,6 +325,8 @@ class BeeColonyEnv(ParallelEnv):
             if not wasp.is_alive:
                 continue
             position = self.wasp_coordinates[wasp.id]
+            if move_masks is not None:
+                masks[2][wasp.id][:WASP_ATTACK] *= move_masks[position]
             if position not in self.beehive_coordinates:
                 masks[2][wasp.id][WASP_ATTACK] = 0
 
@@ -245,48 +336,129 @@ class BeeColonyEnv(ParallelEnv):
                 all(not bee.is_alive for colony in self.bees_by_colony for bee in colony)
         )
 
+        rewards = compute_rewards(self._events, colony_healths(self.queen_bees) - health_before,
+                                  [len(colony) for colony in self.bees_by_colony], alive_before, self.config)
+
         # Get observations
-        observations = (
-            [self.__observation(agent) for agent in self.queen_bees],
-            tuple(
-                [self.__observation(bee) for bee in colony] for colony in self.bees_by_colony
-            ),
-            [self.__observation(agent) for agent in self.wasps]
-        )
+        observations = self.__observe_all()
+        self.__snapshot_colonies()
 
         # Infos
-        infos = {
-            "timestep": self.timestep,
-            "alive": {
-                queen.id: queen.alive_bees for queen in self.queen_bees
-            },
-            "dead_count": {
-                queen.id: [not bee.is_alive for bee in queen.bees].count(True) for queen in self.queen_bees
-            },
-            "food": {
-                queen.id: queen.food_quantity for queen in self.queen_bees
-            },
-            "health": {
-                queen.id: HEALTH_SCORE_FUNCTION(queen.food_quantity, queen.alive_bees) for queen in self.queen_bees
-            },
-            "health_tendency_counter": {
-                queen.id: queen.health_tendency_counter for queen in self.queen_bees
-            },
-            "presence_in_beehive": {
-                queen.id: np.count_nonzero(queen.presence_array == 1) for queen in self.queen_bees
-            }
-        }
+        infos = self.__infos()
 
         return observations, rewards, masks, done, infos
 
     def render(self):
+        if self._grid is None:
+            from bee_colonies.models.grid import Grid
+            self._grid = Grid(*self._grid_shape, config=self.config)
         alive_wasps_coordinates = [
             wasp_coord for index, wasp_coord in enumerate(self.wasp_coordinates) if self.wasps[index].is_alive
         ]
         self._grid.populate(self.flowers, self.bee_coordinates, self.beehive_coordinates,
-                            alive_wasps_coordinates)
+                            alive_wasps_coordinates, self.terrain)
         self._grid.render()
 
+    def close(self):
+        """Closes the rendering window."""
+        if self._grid is not None:
+            self._grid.close()
+            self._grid = None
+
+    def action_space(self, agent: Agent):
+        """gymnasium space of the agent's actions, for external consumers."""
+        return agent.action_space.to_gymnasium()
+
+    def sample_random_actions(self, agents: list[Agent]) -> dict[Agent, int | np.ndarray]:
+        """
+        Samples the actions of the agents following the default random policy (Bee, Wasp and QueenBee's action()),
+        all at once per agent type, from the environment's RNG.
+        Agents with their own policy are left out.
+        """
+        groups: dict[type, list[Agent]] = {}
+        for agent in agents:
+            for base in (Bee, Wasp, QueenBee):
+                if type(agent).action is base.action:
+                    groups.setdefault(base, []).append(agent)
+                    break
+
+        actions = {}
+        for base, group in groups.items():
+            space = group[0].action_space
+            if base is QueenBee:
+                masks = [
+                    agent.mask if agent.mask is not None else 2 * np.ones(agent.action_space.n, dtype=np.int8)
+                    for agent in group
+                ]
+                sampled = space.sample_batch(masks, rng=self.np_random)
+            else:
+                masks = np.stack([
+                    agent.mask if agent.mask is not None else np.ones(space.n, dtype=np.int8) for agent in group
+                ])
+                sampled = [int(action) for action in space.sample_batch(masks, rng=self.np_random)]
+            actions.update(zip(group, sampled))
+        return actions
+
+    def reseed(self, seed):
+        """Seeds the environment as constructing it with this seed would, before reusing it for another episode."""
+        self.seed = seed
+        configure_seed(self.seed)
+        self.np_random = np.random.default_rng(self.seed)
+
+    def vision_radius(self, agent_class: type) -> int:
+        """Radius of the square window agents of the given class observe."""
+        if issubclass(agent_class, QueenBee):
+            multiplier = self.config.queen_bee_vision_multiplier
+        elif issubclass(agent_class, Bee):
+            multiplier = self.config.bee_vision_multiplier
+        elif issubclass(agent_class, Wasp):
+            multiplier = self.config.wasp_vision_multiplier
+        else:
+            raise Exception("Unknown agent type")
+        return int(self._range_of_vision * multiplier)
+
+    def is_asleep(self, agent: Agent) -> bool:
+        """Dead agents and dormant bees: whatever they do this step has no effect."""
+        return not agent.is_alive or agent in self.dormant
+
+    def awake_agents(self) -> list[Agent]:
+        """Agents whose policy has to be evaluated this step, in the order actions are applied."""
+        return [
+            agent for agent in (
+                *self.queen_bees,
+                *(bee for colony in self.bees_by_colony for bee in colony),
+                *self.wasps,
+            ) if agent.is_alive and agent not in self.dormant
+        ]
+
+    def is_quiescent(self) -> bool:
+        """
+        Whether no agent can affect the colony metrics anymore: every colony has collapsed.
+        From then on only flowers regrow and the remaining wasps wander.
+        """
+        return all(not queen_bee.is_alive for queen_bee in self.queen_bees)
+
+    def fast_forward(self, n_steps: int) -> list[dict]:
+        """
+        Advances a quiescent environment by n_steps without simulating the agents.
+        Flowers regrow analytically and the infos of each skipped step are returned in bulk.
+        Wasps are left where they are.
+        """
+        if not self.is_quiescent():
+            raise Exception("Only a quiescent environment can be fast-forwarded")
+        if n_steps <= 0:
+            return []
+        # nothing collects pollen anymore, flowers only regrow
+        self._regrowth.advance_to(self.__tick(self.timestep + n_steps, after_actions=True))
+        infos = self.__infos()
+        all_infos = []
+        for timestep in range(self.timestep + 1, self.timestep + n_steps + 1):
+            step_infos = {key: copy(value) for key, value in infos.items()}
+            step_infos["timestep"] = timestep
+            all_infos.append(step_infos)
+        self.timestep += n_steps
+        return all_infos
+
     ## Helper functions
 
     def permissive_masks(self):
@@ -334,32 +506,100 @@ class BeeColonyEnv(ParallelEnv):
             ]
         )
 
+    def __move_bee(self, colony: int, slot: int, coord: Coord | None):
+        """Puts a bee at a cell (None: off the grid), noting it for the next placement."""
+        if self.bee_coordinates[colony][slot] != coord:
+            self.bee_coordinates[colony][slot] = coord
+            self._moved_bees.add((colony, slot))
+
+    def __place_agents(self) -> ChunkedWorld:
+        """
+        Moves the agents of the world's layers to their current cells, only touching those that changed since the
+        last step: bees that moved, were born, died or were sent back to their hive, wasps that moved or died and
+        beehives whose queen died.
+
+        Returns the cells whose content changed, as a layer of their own to query views against.
+        """
+        changed = self._changed
+        for layer in (BEES, WASPS, BEEHIVES):
+            changed.clear(layer)
+        placed_bees = self._placed_bees
+        for key in self._moved_bees:
+            colony, i = key
+            bee_coord = self.bee_coordinates[colony][i]
+            old_coord = placed_bees.get(key)
+            if old_coord != bee_coord:
+                self.world.move(BEES, key, old_coord, bee_coord)
+                changed.add(BEES, old_coord, old_coord)
+                changed.add(BEES, bee_coord, bee_coord)
+                placed_bees[key] = bee_coord
+        self._moved_bees.clear()
+
+        placed_wasps = self._placed_wasps
+        for wasp in self.wasps:
+            wasp_coord, is_alive = self.wasp_coordinates[wasp.id], wasp.is_alive
+            old_coord, was_alive = placed_wasps[wasp.id] if wasp.id < len(placed_wasps) else (None, None)
+            if old_coord != wasp_coord:
+                self.world.move(WASPS, wasp.id, old_coord, wasp_coord)
+                changed.add(WASPS, old_coord, old_coord)
+            if old_coord != wasp_coord or was_alive != is_alive:
+                changed.add(WASPS, wasp_coord, wasp_coord)
+        self._placed_wasps = [(self.wasp_coordinates[wasp.id], wasp.is_alive) for wasp in self.wasps]
+
+        hives_alive = [queen_bee.is_alive for queen_bee in self.queen_bees]
+        for index, is_alive in enumerate(hives_alive):
+            if index >= len(self._placed_hives) or self._placed_hives[index] != is_alive:
+                changed.add(BEEHIVES, index, self.beehive_coordinates[index])
+        self._placed_hives = hives_alive
+        return changed
+
+    def __snapshot_colonies(self):
+        """Colonies' flower claims are assigned from the positions the bees observed."""
+        for queen_bee in self.queen_bees:
+            queen_bee.flower_claims.new_step(self.bee_coordinates[queen_bee.id], self.bees_by_colony[queen_bee.id])
+
+    def __tick(self, timestep: int = None, after_actions: bool = False) -> int:
+        """Flower ticks: two per step, one before and one after the agents act."""
+        timestep = self.timestep if timestep is None else timestep
+        return 2 * timestep + (1 if after_actions else 0)
+
+    def __infos(self) -> dict:
+        """Timestep and the selected metrics of each colony, read from counters kept up to date by the colonies."""
+        infos = {"timestep": self.timestep}
+        for name in self._info_metrics:
+            metric = INFO_METRICS[name]
+            infos[name] = {queen.id: metric(queen) for queen in self.queen_bees}
+        return infos
+
     def __random_position(self) -> Coord:
         return random.randint(0, self._grid_shape[0] - 1), random.randint(0, self._grid_shape[1] - 1)
 
-    def __taken_positions(self) -> list[Coord]:
+    def __is_available(self, position: Coord) -> bool:
         # agents do not occupy the space, they may overlap
-        flower_coordinates = self.flower_coordinates or []
-        beehive_coordinates = self.beehive_coordinates or []
-        return flower_coordinates + beehive_coordinates
+        if self.terrain is not None and not self.terrain.is_passable(position):
+            return False
+        if self.layout is not None:
+            # the occupancy layer of the layout, flowers dropped on impassable cells were ruled out above
+            has_flower = self.layout.has_flower(position)
+        else:
+            has_flower = position in (self.flowers or {})
+        return not has_flower and position not in (self.beehive_coordinates or [])
 
     def __random_available_position(self) -> Coord:
         position = self.__random_position()
-        while position in self.__taken_positions():
+        while not self.__is_available(position):
             position = self.__random_position()
         return position
 
     def __random_available_position_within(self, center, radius) -> Coord:
         bound_x = max(0, center[0] - radius), min(self._grid_shape[0] - 1, center[0] + radius)
         bound_y = max(0, center[1] - radius), min(self._grid_shape[1] - 1, center[1] + radius)
-        possible_coords = [
-            (x, y)
-            for x in range(bound_x[0], bound_x[1] + 1)
-            for y in range(bound_y[0], bound_y[1] + 1)
-            if manhattan_distance((x, y), center) <= radius
-        ]
+        xs, ys = np.meshgrid(np.arange(bound_x[0], bound_x[1] + 1), np.arange(bound_y[0], bound_y[1] + 1),
+                             indexing='ij')
+        within = manhattan_distances(np.stack((xs, ys), axis=-1), center) <= radius
+        possible_coords = list(zip(xs[within].tolist(), ys[within].tolist()))
         position = random.choice(possible_coords)
-        while position in self.__taken_positions():
+        while not self.__is_available(position):
             position = random.choice(possible_coords)
         return position
 
@@ -371,6 +611,8 @@ class BeeColonyEnv(ParallelEnv):
             random.shuffle(all_coordinates)  # Shuffle to get a random order
 
             for potential_location in all_coordinates:
+                if self.terrain is not None and not self.terrain.is_passable(potential_location):
+                    continue
                 if all(manhattan_distance(potential_location, existing_location) >= min_distance
                     for existing_location in self.beehive_coordinates):
                     return potential_location
@@ -411,53 +653,75 @@ class BeeColonyEnv(ParallelEnv):
                 return index
         return None
 
+    def __observe_all(self) -> tuple[list, tuple[list], list]:
+        """
+        Observations of every agent; agents at the same cell share one view of the world.
+
+        Views are updated incrementally: a view of the last step is reused unless a cell within it changed, and
+        views nobody looks through anymore are dropped, with their flowers. Pollen needs no update: views hold the
+        flowers themselves.
+        """
+        changed = self.__place_agents()
+        self._previous_views = {
+            (center, radius): view for (center, radius), view in self._shared_views.items()
+            if not any(changed.any_within(layer, center, radius) for layer in (BEES, WASPS, BEEHIVES))
+        }
+        self._shared_views = {}
+        observations = (
+            [self.__observation(agent) for agent in self.queen_bees],
+            tuple(
+                [self.__observation(bee) for bee in colony] for colony in self.bees_by_colony
+            ),
+            [self.__observation(agent) for agent in self.wasps]
+        )
+        # flowers of the views nobody looks through anymore are dropped with them
+        self._flower_views = {
+            key: flowers for key, flowers in self._flower_views.items() if key in self._shared_views
+        }
+        return observations
+
     def __observation(self, agent: Agent):
         if not agent.is_alive:
-            return self.__empty_obs()
-        multiplier = 1
+            return EMPTY_OBSERVATION
+        if agent in self.dormant:
+            return {**EMPTY_OBSERVATION, "position": self.bee_coordinates[agent.queen_id][agent.local_beehive_id]}
         if isinstance(agent, QueenBee):
             center: Coord = agent.spawn_location
-            multiplier = QUEEN_BEE_VISION_MULTIPLIER
         elif isinstance(agent, Bee):
             center: Coord = self.bee_coordinates[agent.queen_id][agent.local_beehive_id]
-            multiplier = BEE_VISION_MULTIPLIER
         elif isinstance(agent, Wasp):
             center: Coord = self.wasp_coordinates[agent.id]
-            multiplier = WASP_VISION_MULTIPLIER
         else:
             raise Exception("Unknown agent type")
 
-        visible_cells = [
-            (center[0] + i, center[1] + j)
-            for i in range(-int(self._range_of_vision * multiplier), int(self._range_of_vision * multiplier) + 1)
-            for j in range(-int(self._range_of_vision * multiplier), int(self._range_of_vision * multiplier) + 1)
-            if 0 <= center[0] + i < self._grid_shape[0] and 0 <= center[1] + j < self._grid_shape[1]
-        ]
-
-        observation = {
-            "position": center,
-            "beehives": [ 
-                        (beehive_coord, self.queen_bees[index].is_alive)  
-                        for index, beehive_coord in enumerate(self.beehive_coordinates)
-                        if beehive_coord in visible_cells
-                        ],
-            "flowers": [flower for flower in self.flowers.values() if flower.position in visible_cells],
-            "bees": [
-                (colony, i, bee_coord)
-                for colony, colony_coords in enumerate(self.bee_coordinates)
-                for i, bee_coord in enumerate(colony_coords) if bee_coord in visible_cells
-            ],
-            "wasps": [(wasp_coord, self.wasps[index].is_alive) for index, wasp_coord in enumerate(self.wasp_coordinates) if wasp_coord in visible_cells],
-        }
-        return observation
-
-    def __empty_obs(self):
+        radius = self.vision_radius(type(agent))
+        key = (center, radius)
+        view = self._shared_views.get(key)
+        if view is None:
+            view = self._previous_views.get(key) or self.__view(center, radius)
+            self._shared_views[key] = view
+        return {"position": center, **view}
+
+    def __view(self, center: Coord, radius: int) -> dict:
+        flowers = self._flower_views.get((center, radius))
+        if flowers is None:
+            flowers = self._flower_views[(center, radius)] = tuple(
+                self._flower_list[index] for index, _ in self.world.query(FLOWERS, center, radius)
+            )
+        # tuples: the view is shared, policies must not modify it
         return {
-            "position": None,
-            "beehives": [],
-            "flowers": [],
-            "bees": [],
-            "wasps": [],
+            "beehives": tuple(
+                (beehive_coord, self.queen_bees[index].is_alive)
+                for index, beehive_coord in self.world.query(BEEHIVES, center, radius)
+            ),
+            "flowers": flowers,
+            "bees": tuple(
+                (colony, i, bee_coord) for (colony, i), bee_coord in self.world.query(BEES, center, radius)
+            ),
+            "wasps": tuple(
+                (wasp_coord, self.wasps[index].is_alive)
+                for index, wasp_coord in self.world.query(WASPS, center, radius)
+            ),
         }
 
     def __update_agent(self, agent: Agent, action: int | np.ndarray):
@@ -468,13 +732,14 @@ class BeeColonyEnv(ParallelEnv):
             picked_bee, is_new = agent.timestep()
             if picked_bee:
                 if is_new:
-                    if picked_bee not in self.bees_by_colony[picked_bee.queen_id]:
-                        self.bees_by_colony[picked_bee.queen_id].append(picked_bee)
-                    self.bee_coordinates[picked_bee.queen_id].append(picked_bee.beehive_location)
+                    slot = picked_bee.local_beehive_id
+                    put_in_slot(self.bees_by_colony[picked_bee.queen_id], slot, picked_bee)
+                    put_in_slot(self.bee_coordinates[picked_bee.queen_id], slot, picked_bee.beehive_location)
+                    self._moved_bees.add((picked_bee.queen_id, slot))
                 else:
                     # self.bees_by_colony[picked_bee.beehive_id].remove(picked_bee)
                     picked_bee.is_alive = False
-                    self.bee_coordinates[picked_bee.queen_id][picked_bee.local_beehive_id] = None
+                    self.__move_bee(picked_bee.queen_id, picked_bee.local_beehive_id, None)
                     # queen.dead_bee(...) is called on timestep(), do not call it here
         elif isinstance(agent, Bee):
             position: Coord = self.bee_coordinates[agent.queen_id][agent.local_beehive_id]
@@ -482,13 +747,13 @@ class BeeColonyEnv(ParallelEnv):
             if action == BEE_STAY:
                 return
             elif action == BEE_UP:  # move up
-                self.bee_coordinates[agent.queen_id][agent.local_beehive_id] = self.__clamp_coord((x - 1, y))
+                self.__move_bee(agent.queen_id, agent.local_beehive_id, self.__move_to(position, (x - 1, y)))
             elif action == BEE_DOWN:  # move down
-                self.bee_coordinates[agent.queen_id][agent.local_beehive_id] = self.__clamp_coord((x + 1, y))
+                self.__move_bee(agent.queen_id, agent.local_beehive_id, self.__move_to(position, (x + 1, y)))
             elif action == BEE_LEFT:  # move left
-                self.bee_coordinates[agent.queen_id][agent.local_beehive_id] = self.__clamp_coord((x, y - 1))
+                self.__move_bee(agent.queen_id, agent.local_beehive_id, self.__move_to(position, (x, y - 1)))
             elif action == BEE_RIGHT:  # move right
-                self.bee_coordinates[agent.queen_id][agent.local_beehive_id] = self.__clamp_coord((x, y + 1))
+                self.__move_bee(agent.queen_id, agent.local_beehive_id, self.__move_to(position, (x, y + 1)))
 
             elif action == BEE_ATTACK:  # attack wasp
                 for wasp in self.wasps:
@@ -498,6 +763,8 @@ class BeeColonyEnv(ParallelEnv):
                     if position == wasp_position:
                         if wasp.health > 0:
                             wasp.receive_damage(agent.attack_power)
+                            self._events.bee_damage_dealt[agent.queen_id][agent.local_beehive_id] += agent.attack_power
+                            self._events.wasp_damage_received[wasp.id] += agent.attack_power
                             agent.is_alive = False  # kamikaze
                             agent.queen.dead_bee(agent.local_beehive_id)
                             # no need to move to beehive since it's already there
@@ -507,9 +774,10 @@ class BeeColonyEnv(ParallelEnv):
                         break
 
             elif action == BEE_PICK:  # pick up pollen
-                if position not in self.flower_coordinates:
+                if position not in self.flowers:
                     return
                 if self.flowers[position].collect_pollen():
+                    self._regrowth.schedule(self.flowers[position])
                     agent.collect_pollen()
 
             elif action == BEE_DROP:  # drop / enter beehive
@@ -518,6 +786,7 @@ class BeeColonyEnv(ParallelEnv):
                     queen_bee: QueenBee = self.queen_bees[agent.queen_id]
                     if agent.drop_pollen():
                         queen_bee.receive_polen()
+                        self._events.pollen_delivered[agent.queen_id][agent.local_beehive_id] += 1
                     queen_bee.welcome(agent)
             else:
                 raise Exception("Unknown action")
@@ -528,18 +797,20 @@ class BeeColonyEnv(ParallelEnv):
             if action == WASP_STAY:
                 return
             elif action == WASP_UP:
-                self.wasp_coordinates[agent.id] = self.__clamp_coord((x - 1, y))
+                self.wasp_coordinates[agent.id] = self.__move_to(position, (x - 1, y))
             elif action == WASP_DOWN:
-                self.wasp_coordinates[agent.id] = self.__clamp_coord((x + 1, y))
+                self.wasp_coordinates[agent.id] = self.__move_to(position, (x + 1, y))
             elif action == WASP_LEFT:
-                self.wasp_coordinates[agent.id] = self.__clamp_coord((x, y - 1))
+                self.wasp_coordinates[agent.id] = self.__move_to(position, (x, y - 1))
             elif action == WASP_RIGHT:
-                self.wasp_coordinates[agent.id] = self.__clamp_coord((x, y + 1))
+                self.wasp_coordinates[agent.id] = self.__move_to(position, (x, y + 1))
             elif action == WASP_ATTACK:
                 for queen_bee_id, beehive in enumerate(self.beehive_coordinates):
                     if position == beehive:
                         if self.queen_bees[queen_bee_id].is_alive:
                             self.queen_bees[queen_bee_id].receive_damage(agent.attack_power)
+                            self._events.hive_damage_received[queen_bee_id] += agent.attack_power
+                            self._events.wasp_damage_dealt[agent.id] += agent.attack_power
             else:
                 raise Exception("Unknown action")
         else:
@@ -554,6 +825,13 @@ class BeeColonyEnv(ParallelEnv):
         new_y = max(0, min(self._grid_shape[1] - 1, current_position[1] + random_move[1]))
         return (new_x, new_y)
 
+    def __move_to(self, position: Coord, coord: Coord) -> Coord:
+        """Moves within the grid; impassable cells cannot be entered."""
+        coord = self.__clamp_coord(coord)
+        if self.terrain is not None and not self.terrain.is_passable(coord):
+            return position
+        return coord
+
     def __clamp_coord(self, coord):
         return max(0, min(coord[0], self._grid_shape[0] - 1)), max(0, min(coord[1], self._grid_shape[1] - 1))
 
@@ -571,10 +849,14 @@ class BeeColonyEnv(ParallelEnv):
             bee_number -= n_bees
         return None
 
-    def __get_all_sections(self):
-        return [
-            (a, b)
-            for a in range(0, self._grid_shape[0], self._section_size)
-            for b in range(0, self._grid_shape[1], self._section_size)
-        ]
 
+
+
+@lru_cache(maxsize=None)
+def parallel_env_class() -> type:
+    """
+    BeeColonyEnv as a pettingzoo ParallelEnv.
+    pettingzoo is only imported here, so plain simulation runs do not pay for it.
+    """
+    from pettingzoo import ParallelEnv
+    return type("BeeColonyParallelEnv", (BeeColonyEnv, ParallelEnv), {})
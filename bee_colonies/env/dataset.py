@@ -0,0 +1,259 @@
+"""
+Step-by-step dataset of an episode: observations in tensor form, masks, actions and infos,
+written as fixed-size compressed .npz shards.
+
+DatasetRecorder wraps an environment: every reset() and step() passes through it, and each step's record is
+encoded in the simulation thread, then handed over a bounded queue to a background thread that stacks and
+compresses full shards. Disk writes never stall the simulation, and at most `max_pending_shards` shards wait in memory.
+
+Record t holds the observations and masks the agents saw at timestep t, the actions they took from them
+(-1 for agents that did not act) and the infos of the step that led to timestep t (empty after reset).
+
+Each kind of agent (queen, bee, wasp) has, per shard:
+- <kind>_offsets: (n_steps + 1,) rows of each step in the arrays below
+- <kind>_ids: agent ids (bees: (colony, local id))
+- <kind>_observations: (rows, OBSERVATION_CHANNELS, 2r + 1, 2r + 1) uint8 counts around the agent
+- <kind>_masks and <kind>_actions: (rows, n_actions) for bees and wasps; for queens, whose action space follows
+  the size of their colony, values concatenated over the rows with queen_action_offsets
+Infos are stored as timestep and info_<metric>: (n_steps, n_colonies).
+"""
+import os
+import queue
+import threading
+
+import numpy as np
+
+from bee_colonies.models.bee import Bee
+from bee_colonies.models.queen_bee import QueenBee
+from bee_colonies.models.wasp import Wasp
+
+# channels of the observation tensors
+FLOWERS_WITH_POLLEN, FLOWERS_WITHOUT_POLLEN, ALIVE_BEEHIVES, BEES, ALIVE_WASPS = range(5)
+OBSERVATION_CHANNELS = 5
+NO_ACTION = -1
+
+KINDS = ("queen", "bee", "wasp")
+DEFAULT_SHARD_SIZE = 100
+DEFAULT_MAX_PENDING_SHARDS = 4
+SHARD_PATTERN = "shard_{:05d}.npz"
+
+
+def dataset_path(csv_path: str) -> str:
+    return f"{os.path.splitext(csv_path)[0]}_dataset"
+
+
+def encode_view(observation: dict, radius: int) -> np.ndarray:
+    """(OBSERVATION_CHANNELS, 2r + 1, 2r + 1) counts of what the observation holds, centered on its position."""
+    size = 2 * radius + 1
+    tensor = np.zeros((OBSERVATION_CHANNELS, size, size), dtype=np.uint8)
+    position = observation["position"]
+    if position is None:
+        return tensor
+    x0, y0 = position[0] - radius, position[1] - radius
+    cells = [
+        (FLOWERS_WITH_POLLEN if flower.pollen else FLOWERS_WITHOUT_POLLEN, *flower.position)
+        for flower in observation["flowers"]
+    ]
+    cells += [(ALIVE_BEEHIVES, *coord) for coord, is_alive in observation["beehives"] if is_alive]
+    cells += [(BEES, *coord) for _, _, coord in observation["bees"]]
+    cells += [(ALIVE_WASPS, *coord) for coord, is_alive in observation["wasps"] if is_alive]
+    if cells:
+        channels, xs, ys = np.array(cells).T
+        np.add.at(tensor, (channels, xs - x0, ys - y0), 1)
+    return tensor
+
+
+class DatasetRecorder:
+    """
+    Environment wrapper recording every step into `directory`. Anything else is delegated to the environment.
+    Call close() (or use it as a context manager) to write the last, partial shard.
+    """
+
+    def __init__(self, env, directory: str, shard_size: int = DEFAULT_SHARD_SIZE,
+                 max_pending_shards: int = DEFAULT_MAX_PENDING_SHARDS):
+        self.env = env
+        self.directory = directory
+        self.shard_size = shard_size
+        os.makedirs(directory, exist_ok=True)
+        self._records: list[dict] = []
+        self._pending = None  # observations, masks and infos waiting for the actions taken from them
+        self._n_shards = 0
+        self._queue = queue.Queue(maxsize=max_pending_shards)
+        self._error = None
+        self._writer = threading.Thread(target=self._write_shards, daemon=True)
+        self._writer.start()
+
+    def __getattr__(self, name):
+        return getattr(self.env, name)
+
+    def reset(self):
+        observations = self.env.reset()
+        self._flush_pending()
+        self._pending = (self.env.timestep, observations, self.env.init_masks(), {})
+        return observations
+
+    def step(self, actions: dict):
+        self._flush_pending(actions)
+        observations, rewards, masks, done, infos = self.env.step(actions)
+        self._pending = (self.env.timestep, observations, masks, infos)
+        return observations, rewards, masks, done, infos
+
+    def close(self):
+        """Writes what is left and waits for the writer; the environment itself is not closed."""
+        if self._writer is None:
+            return
+        self._flush_pending()
+        if self._records:
+            self._put(self._records)
+            self._records = []
+        self._queue.put(None)
+        self._writer.join()
+        self._writer = None
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _flush_pending(self, actions: dict = None):
+        if self._pending is None:
+            return
+        self._records.append(self._encode(*self._pending, actions or {}))
+        self._pending = None
+        if len(self._records) == self.shard_size:
+            self._put(self._records)
+            self._records = []
+
+    def _put(self, records: list[dict]):
+        if self._error is not None:
+            raise self._error
+        self._queue.put(records)
+
+    def _encode(self, timestep: int, observations, masks, infos: dict, actions: dict) -> dict:
+        """Arrays of one step, built in the simulation thread: observations hold live objects."""
+        env = self.env
+        queen_observations, bee_observations, wasp_observations = observations
+        queen_masks, bee_masks, wasp_masks = masks
+        kinds = {
+            "queen": [(queen, queen.id, queen_observations[queen.id], queen_masks[queen.id])
+                      for queen in env.queen_bees if queen.is_alive],
+            "bee": [(bee, (colony, bee.local_beehive_id), bee_observations[colony][bee.local_beehive_id],
+                     bee_masks[colony][bee.local_beehive_id])
+                    for colony, colony_bees in enumerate(env.bees_by_colony) for bee in colony_bees if bee.is_alive],
+            "wasp": [(wasp, wasp.id, wasp_observations[wasp.id], wasp_masks[wasp.id])
+                     for wasp in env.wasps if wasp.is_alive],
+        }
+        record = {"timestep": timestep, "infos": infos}
+        for kind, agent_class in zip(KINDS, (QueenBee, Bee, Wasp)):
+            rows = kinds[kind]
+            radius = env.vision_radius(agent_class)
+            # agents at the same cell share their view: each view is encoded once
+            encoded = {}
+            tensors = []
+            for _, _, observation, _ in rows:
+                key = (observation["position"], id(observation["bees"]))
+                if key not in encoded:
+                    encoded[key] = encode_view(observation, radius)
+                tensors.append(encoded[key])
+            size = 2 * radius + 1
+            ids = np.array([agent_id for _, agent_id, _, _ in rows], dtype=np.int32)
+            record[f"{kind}_ids"] = ids.reshape(-1, 2) if kind == "bee" else ids
+            record[f"{kind}_observations"] = (
+                np.stack(tensors) if tensors else np.zeros((0, OBSERVATION_CHANNELS, size, size), dtype=np.uint8)
+            )
+            record[f"{kind}_masks"] = [np.asarray(mask, dtype=np.int8) for _, _, _, mask in rows]
+            no_action = (lambda mask: np.full(np.shape(mask), NO_ACTION, dtype=np.int16)) if kind == "queen" \
+                else (lambda mask: NO_ACTION)
+            record[f"{kind}_actions"] = [
+                np.asarray(actions[agent], dtype=np.int16) if agent in actions else no_action(mask)
+                for agent, _, _, mask in rows
+            ]
+        return record
+
+    def _write_shards(self):
+        while True:
+            records = self._queue.get()
+            if records is None:
+                return
+            if self._error is not None:
+                continue
+            try:
+                self._write_shard(records)
+            except Exception as error:
+                self._error = error
+
+    def _write_shard(self, records: list[dict]):
+        arrays = {"timestep": np.array([record["timestep"] for record in records], dtype=np.int32)}
+        # per-colony metrics; NaN for records without infos (right after reset)
+        n_colonies = len(self.env.queen_bees)
+        metrics = sorted({name for record in records for name, value in record["infos"].items()
+                          if isinstance(value, dict)})
+        for name in metrics:
+            arrays[f"info_{name}"] = np.array([
+                [record["infos"][name][colony] for colony in range(n_colonies)]
+                if name in record["infos"] else [np.nan] * n_colonies for record in records
+            ], dtype=np.float64)
+        for kind in KINDS:
+            counts = [len(record[f"{kind}_ids"]) for record in records]
+            arrays[f"{kind}_offsets"] = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+            arrays[f"{kind}_ids"] = np.concatenate([record[f"{kind}_ids"] for record in records])
+            arrays[f"{kind}_observations"] = np.concatenate([record[f"{kind}_observations"] for record in records])
+            masks = [mask for record in records for mask in record[f"{kind}_masks"]]
+            actions = [action for record in records for action in record[f"{kind}_actions"]]
+            if kind == "queen":
+                arrays["queen_action_offsets"] = np.concatenate(
+                    [[0], np.cumsum([mask.size for mask in masks])]
+                ).astype(np.int64)
+                masks, actions = [mask.ravel() for mask in masks], [action.ravel() for action in actions]
+                arrays["queen_masks"] = np.concatenate(masks) if masks else np.zeros(0, dtype=np.int8)
+                arrays["queen_actions"] = np.concatenate(actions) if actions else np.zeros(0, dtype=np.int16)
+            else:
+                arrays[f"{kind}_masks"] = np.stack(masks) if masks else np.zeros((0, 0), dtype=np.int8)
+                arrays[f"{kind}_actions"] = np.array(actions, dtype=np.int16)
+        path = os.path.join(self.directory, SHARD_PATTERN.format(self._n_shards))
+        temporary = f"{path}.tmp.npz"
+        np.savez_compressed(temporary, **arrays)
+        os.replace(temporary, path)
+        self._n_shards += 1
+
+
+class Dataset:
+    """Streams the steps of a recorded dataset, loading one shard at a time."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.shards = sorted(
+            os.path.join(directory, name) for name in os.listdir(directory)
+            if name.startswith("shard_") and name.endswith(".npz") and ".tmp" not in name
+        )
+
+    def __iter__(self):
+        for shard_path in self.shards:
+            yield from self.shard_steps(shard_path)
+
+    @staticmethod
+    def shard_steps(shard_path: str):
+        """Steps of one shard, as dicts of arrays sliced out of it."""
+        with np.load(shard_path) as shard:
+            arrays = {name: shard[name] for name in shard.files}
+        for step, timestep in enumerate(arrays["timestep"]):
+            record = {"timestep": int(timestep), "infos": {
+                name[len("info_"):]: values[step] for name, values in arrays.items() if name.startswith("info_")
+            }}
+            for kind in KINDS:
+                start, end = arrays[f"{kind}_offsets"][step:step + 2]
+                record[f"{kind}_ids"] = arrays[f"{kind}_ids"][start:end]
+                record[f"{kind}_observations"] = arrays[f"{kind}_observations"][start:end]
+                if kind == "queen":
+                    offsets = arrays["queen_action_offsets"][start:end + 1]
+                    record["queen_masks"] = np.split(arrays["queen_masks"][offsets[0]:offsets[-1]],
+                                                     offsets[1:-1] - offsets[0])
+                    record["queen_actions"] = np.split(arrays["queen_actions"][offsets[0]:offsets[-1]],
+                                                       offsets[1:-1] - offsets[0])
+                else:
+                    record[f"{kind}_masks"] = arrays[f"{kind}_masks"][start:end]
+                    record[f"{kind}_actions"] = arrays[f"{kind}_actions"][start:end]
+            yield record
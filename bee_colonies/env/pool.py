@@ -0,0 +1,48 @@
+"""
+Pool of environments kept warm between episodes.
+
+Environments reset their agents in place, so an environment that finished an episode can run the next one of the
+same scenario (same classes and config, any seed) without building a new environment, new agents or a new
+rendering window.
+"""
+from collections import defaultdict
+
+
+class EnvironmentPool:
+    def __init__(self, factory):
+        """factory(queen_bee_classes, bee_classes, wasp_class, config) builds a new environment."""
+        self.factory = factory
+        self._idle = defaultdict(list)
+        self._keys = {}
+
+    @staticmethod
+    def scenario_key(queen_bee_classes, bee_classes, wasp_class, config) -> tuple:
+        return tuple(queen_bee_classes), tuple(bee_classes), wasp_class, repr(config.override(seed=None))
+
+    def acquire(self, queen_bee_classes, bee_classes, wasp_class, config):
+        """An environment of the scenario seeded with config.seed, reused when one is idle. Call reset() before use."""
+        key = self.scenario_key(queen_bee_classes, bee_classes, wasp_class, config)
+        idle = self._idle[key]
+        if idle:
+            env = idle.pop()
+            env.reseed(config.seed)
+            return env
+        env = self.factory(queen_bee_classes, bee_classes, wasp_class, config)
+        self._keys[env] = key
+        return env
+
+    def release(self, env):
+        """Makes an environment acquired from this pool available again."""
+        self._idle[self._keys[env]].append(env)
+
+    def close(self):
+        for env in self._keys:
+            env.close()
+        self._idle.clear()
+        self._keys.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,53 @@
+"""
+Per-agent rewards of a step, computed as array operations over the step's event counters.
+
+The environment counts events into StepEvents as actions are applied (one index increment per event), then
+compute_rewards weighs the counters with the config's reward_* entries:
+- queens: their colony's health delta and delivered pollen, minus the damage wasps dealt to the hive
+- bees: the pollen they delivered and the damage they dealt to wasps, plus their colony's health delta
+- wasps: the damage they dealt to hives, minus the damage they received from bees
+
+Rewards are returned like masks: (queen array, tuple of per-colony bee arrays indexed by slot, wasp array).
+"""
+import numpy as np
+
+from bee_colonies.models.queen_bee import HEALTH_SCORE_FUNCTION
+from config import Config
+
+
+class StepEvents:
+    """Event counters of one step, indexed like the agents (bees by slot of their colony)."""
+
+    def __init__(self, colony_sizes: list[int], n_wasps: int):
+        # a queen can give birth once per step: one spare slot per colony
+        self.pollen_delivered = [np.zeros(size + 1, dtype=np.int32) for size in colony_sizes]
+        self.bee_damage_dealt = [np.zeros(size + 1, dtype=np.int32) for size in colony_sizes]
+        self.hive_damage_received = np.zeros(len(colony_sizes), dtype=np.int32)
+        self.wasp_damage_dealt = np.zeros(n_wasps, dtype=np.int32)
+        self.wasp_damage_received = np.zeros(n_wasps, dtype=np.int32)
+
+
+def colony_healths(queen_bees) -> np.ndarray:
+    return np.array([
+        HEALTH_SCORE_FUNCTION(queen.food_quantity, queen.alive_bees) if queen.is_alive else 0 for queen in queen_bees
+    ], dtype=np.float32)
+
+
+def compute_rewards(events: StepEvents, health_delta: np.ndarray, colony_sizes: list[int], alive_before: list,
+                    config: Config) -> tuple[np.ndarray, tuple[np.ndarray, ...], np.ndarray]:
+    """
+    Rewards of every agent for one step. alive_before holds, per colony, which slots held an alive bee when the step
+    started: only those bees share their colony's health delta.
+    """
+    delivered = np.array([colony.sum() for colony in events.pollen_delivered], dtype=np.float32)
+    queen_rewards = (config.reward_health_delta * health_delta + config.reward_pollen_delivered * delivered
+                     - config.reward_damage_received * events.hive_damage_received)
+    bee_rewards = tuple(
+        (config.reward_pollen_delivered * events.pollen_delivered[colony][:size]
+         + config.reward_damage_dealt * events.bee_damage_dealt[colony][:size]
+         + config.reward_health_delta * health_delta[colony] * alive_before[colony][:size]).astype(np.float32)
+        for colony, size in enumerate(colony_sizes)
+    )
+    wasp_rewards = (config.reward_damage_dealt * events.wasp_damage_dealt
+                    - config.reward_damage_received * events.wasp_damage_received).astype(np.float32)
+    return queen_rewards.astype(np.float32), bee_rewards, wasp_rewards
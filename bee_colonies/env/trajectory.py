@@ -0,0 +1,80 @@
+"""
+Per-step agent position trajectories, appended to a flat binary file and read back through np.memmap.
+
+Each record is one agent at one timestep; records of a timestep are contiguous and timesteps only grow,
+so a run of millions of steps is recorded without holding it in memory, and read back one step at a time.
+Wasps are recorded with colony WASP_COLONY.
+"""
+import os
+
+import numpy as np
+
+WASP_COLONY = -1
+
+TRAJECTORY_DTYPE = np.dtype([
+    ("timestep", np.int32),
+    ("colony", np.int16),
+    ("agent", np.int32),
+    ("x", np.int32),
+    ("y", np.int32),
+])
+
+
+def trajectory_path(csv_path: str) -> str:
+    return f"{os.path.splitext(csv_path)[0]}_trajectory.bin"
+
+
+class TrajectoryRecorder:
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, "wb")
+
+    def record(self, env):
+        """Appends the positions of the environment's agents at its current timestep."""
+        bees = [
+            (colony, i, position)
+            for colony, colony_coords in enumerate(env.bee_coordinates)
+            for i, position in enumerate(colony_coords) if position is not None
+        ]
+        wasps = [(WASP_COLONY, wasp.id, env.wasp_coordinates[wasp.id]) for wasp in env.wasps if wasp.is_alive]
+        agents = bees + wasps
+        records = np.empty(len(agents), dtype=TRAJECTORY_DTYPE)
+        if agents:
+            colonies, ids, positions = zip(*agents)
+            records["timestep"] = env.timestep
+            records["colony"] = colonies
+            records["agent"] = ids
+            records["x"], records["y"] = np.array(positions).T
+        records.tofile(self.file)
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Trajectory:
+    """Read-only view over a recorded trajectory file."""
+
+    def __init__(self, path: str):
+        self.records = np.memmap(path, dtype=TRAJECTORY_DTYPE, mode="r")
+
+    @property
+    def timesteps(self) -> np.ndarray:
+        return np.unique(self.records["timestep"])
+
+    def step(self, timestep: int) -> np.ndarray:
+        """Records of one timestep, found by binary search over the sorted timesteps."""
+        timesteps = self.records["timestep"]
+        start, end = np.searchsorted(timesteps, [timestep, timestep + 1])
+        return self.records[start:end]
+
+    def agent(self, colony: int, agent: int) -> np.ndarray:
+        """Positions of one agent over the whole run."""
+        records = self.records
+        return records[(records["colony"] == colony) & (records["agent"] == agent)]
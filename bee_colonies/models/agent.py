@@ -10,9 +10,9 @@ def apply_mask_to_action(action, mask) -> int | np.ndarray:
     if isinstance(action, int):
         return action * mask[action]
     elif isinstance(action, np.ndarray):
-        for m, (index, _) in zip(mask, enumerate(action)):
-            if m == 0 or m == 1:
-                action[index] = m
+        n = min(len(mask), len(action))
+        mask = np.asarray(mask[:n])
+        np.copyto(action[:n], mask, casting='unsafe', where=(mask == 0) | (mask == 1))
     return action
 
 
@@ -52,16 +52,26 @@ class Agent(ABC):
 
     """
 
+    __slots__ = ("spawn_location", "last_observation", "mask", "is_alive")
+
+    # shared by every agent of a class, unless an agent needs its own
+    action_space = None
+
     def __init__(self):
         self.spawn_location: Coord = None
         self.last_observation = None
         self.mask = None
         self.is_alive = None
-        self.action_space = None
 
     def set_spawn(self, spawn_location: Coord):
         self.spawn_location = spawn_location
 
+    def reset(self):
+        """Back to the state of a new agent, in place, for the next episode."""
+        self.last_observation = None
+        self.mask = None
+        self.is_alive = True
+
     def see(self, observation: np.ndarray, mask: np.ndarray = None):
         self.last_observation = observation
         self.mask = mask
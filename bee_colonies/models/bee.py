@@ -3,31 +3,30 @@ import numpy as np
 from bee_colonies.models.agent import apply_mask_to_action, manhattan_distance
 import numpy as np
 from bee_colonies.models.agent import Agent
-from gym.spaces import Discrete
-from config import get_config
-
-CONFIG = get_config()
+from bee_colonies.models.spaces import DiscreteActions
+from config import Config, get_config
 
 Coord = tuple[int, int]
 
 # 0: stay still, 1: move up, 2: move down, 3: move left, 4: move right, 5: attack, 6: pick, 7: drop
 BEE_STAY, BEE_UP, BEE_DOWN, BEE_LEFT, BEE_RIGHT, BEE_ATTACK, BEE_PICK, BEE_DROP, BEE_N_ACTIONS = range(9)
 
-# FINE TUNE ARGUMENTS
-BEE_ATTACK_POWER = CONFIG["bee_attack_power"]
-
 
 class Bee(Agent):
-    def __init__(self, local_beehive_id):
+    __slots__ = ("config", "beehive_location", "pollen", "queen_id", "queen", "local_beehive_id", "attack_power")
+
+    action_space = DiscreteActions(BEE_N_ACTIONS)
+
+    def __init__(self, local_beehive_id, config: Config = None):
         super().__init__()
+        self.config = config or get_config()
         self.beehive_location = None
         self.is_alive = True
         self.pollen = False  # Indicates if the bee is carrying pollen.
         self.queen_id = None
         self.queen = None
         self.local_beehive_id = local_beehive_id
-        self.attack_power = BEE_ATTACK_POWER
-        self.action_space = Discrete(BEE_N_ACTIONS)
+        self.attack_power = self.config.bee_attack_power
 
     def set_queen(self, queen):
         self.queen_id = queen.id
@@ -39,6 +38,10 @@ class Bee(Agent):
         super().set_spawn(spawn_location)
         self.beehive_location = spawn_location
 
+    def reset(self):
+        super().reset()
+        self.pollen = False
+
     def action(self) -> int:
         """
         This method should be implemented by the child class.
@@ -46,6 +49,15 @@ class Bee(Agent):
         """
         return self.action_space.sample(mask=self.mask)
 
+    def move_home(self, position: Coord) -> int:
+        return self.move_to(position, self.beehive_location)
+
+    def move_to(self, position: Coord, target: Coord) -> int:
+        """Move towards target, read from the colony's cached direction fields when available."""
+        flow_fields = self.queen.flow_fields if self.queen is not None else None
+        move = flow_fields.move(position, target) if flow_fields is not None else None
+        return move_towards(position, target) if move is None else move
+
     def collect_pollen(self):
         """Bee collects pollen from a flower. Since flowers have infinite pollen, just toggle state."""
         if not self.pollen:
@@ -1,18 +1,17 @@
-import numpy as np
-from config import get_config
+from collections import defaultdict
 
-CONFIG = get_config()
-TIME_TO_RESTORE_POLLEN = CONFIG["time_to_restore_pollen"]
-SPREAD_DIVIDER = CONFIG["spread_divider"]
-SPREAD_SCALE = CONFIG["spread_scale"]
+import numpy as np
+from config import DEFAULT_CONFIG
 
 Coord = tuple[int, int]
 
 class Flower:
-    def __init__(self, position) -> None:
+    __slots__ = ("pollen", "position", "time_to_restore_pollen")
+
+    def __init__(self, position, time_to_restore_pollen: int = DEFAULT_CONFIG.time_to_restore_pollen) -> None:
         self.pollen = True
         self.position = position
-        self.counter = 0
+        self.time_to_restore_pollen = time_to_restore_pollen
 
     def collect_pollen(self) -> bool:
         if self.pollen:
@@ -20,31 +19,54 @@ class Flower:
             return True
         return False
 
-    def timestep(self):
-        if self.pollen:
-            self.counter = 0
-        else:
-            self.counter += 1
-            if self.counter >= TIME_TO_RESTORE_POLLEN:
-                self.pollen = True
-                self.counter = 0
+    def restore_pollen(self):
+        self.pollen = True
 
     def __repr__(self):
         return f"{self.position[0]},{self.position[1]}{'*' if self.pollen else ''}"
 
-def generate_flowers(grid_shape: Coord, flower_density: float, hotspots: tuple[Coord, ...]) -> list[Coord]:
+
+class RegrowthScheduler:
+    """
+    Bucket queue of flowers waiting for their pollen, keyed by the tick at which it is restored.
+    Flowers tick twice per environment step (before and after the agents act), so a flower
+    picked during a step gets its pollen back time_to_restore_pollen ticks after the step's first tick.
+    Advancing only touches the flowers whose pollen is restored.
+    """
+
+    def __init__(self, tick: int = 0):
+        self.tick = tick
+        self.buckets: dict[int, list[Flower]] = defaultdict(list)
+
+    def schedule(self, flower: Flower):
+        """Schedules the restoration of a flower whose pollen was just collected."""
+        self.buckets[self.tick + max(flower.time_to_restore_pollen, 1)].append(flower)
+
+    def advance_to(self, tick: int):
+        """Restores the pollen of every flower scheduled up to the given tick."""
+        if tick - self.tick <= len(self.buckets):
+            due = [t for t in range(self.tick + 1, tick + 1) if t in self.buckets]
+        else:
+            due = sorted(t for t in self.buckets if t <= tick)
+        for t in due:
+            for flower in self.buckets.pop(t):
+                flower.restore_pollen()
+        self.tick = max(self.tick, tick)
+
+def generate_flowers(grid_shape: Coord, flower_density: float, hotspots: tuple[Coord, ...],
+                     spread_divider: int = DEFAULT_CONFIG.spread_divider,
+                     spread_scale: float = DEFAULT_CONFIG.spread_scale) -> list[Coord]:
     flower_coordinates = set()
     num_hotspots = len(hotspots)
     max_flowers_per_hotspot = int((grid_shape[0] * grid_shape[1] * (flower_density + 0.05)) / num_hotspots)
     min_flower_per_hotspot = int((grid_shape[0] * grid_shape[1] * (flower_density - 0.05)) / num_hotspots)
     for center in hotspots:
-        spread = np.random.normal(grid_shape[0] // SPREAD_DIVIDER, SPREAD_SCALE)
+        spread = np.random.normal(grid_shape[0] // spread_divider, spread_scale)
         num_flowers = np.random.randint(min_flower_per_hotspot, max_flowers_per_hotspot)
-        for _ in range(num_flowers):
-            flower_coord = int(np.random.normal(center[0], spread)), \
-               int(np.random.normal(center[1], spread))
-            if 0 <= flower_coord[0] < grid_shape[0] and 0 <= flower_coord[1] < grid_shape[1]:
-                flower_coordinates.add(flower_coord)
+        # all (x, y) draws of the hotspot at once, in the same order as drawing them one by one
+        flower_coords = np.random.normal(center, spread, size=(num_flowers, 2)).astype(np.int64)
+        inside = ((flower_coords >= 0) & (flower_coords < grid_shape)).all(axis=1)
+        flower_coordinates.update(zip(*flower_coords[inside].T.tolist()))
     return list(flower_coordinates)
 
 def generate_uniform_flowers(grid_shape: Coord, flower_density: float) -> list[Coord]:
@@ -0,0 +1,201 @@
+from collections import defaultdict
+
+import numpy as np
+
+from bee_colonies.models.flower import Flower
+from bee_colonies.models.world import FLOWERS, ChunkedWorld
+
+Coord = tuple[int, int]
+
+NEAREST, OPTIMAL = "nearest", "optimal"
+
+
+class FlowerClaims:
+    """
+    Colony-level flower claim service.
+
+    Sticky claims (used by social bees): a registry of the flowers some bee of the colony is pursuing.
+
+    Per-step assignment (used by respectful bees): once per step, the colony's bees are assigned the visible
+    pollen flowers they may claim, in one batch. Bees then look up their assignment in O(1).
+    - nearest: a bee claims its nearest visible pollen flower, unless a colony bee it sees is closer to that
+      flower (or as close, with a lower id)
+    - optimal: bees without pollen are matched to visible pollen flowers minimizing the total distance
+
+    Only the flowers within the vision radius of the bees are looked at, queried from the world's chunks, and bees
+    are only compared to the bees around them, so the cost of a step follows what the bees see rather than the size
+    of the world.
+    """
+
+    def __init__(self, mode: str = NEAREST):
+        if mode not in (NEAREST, OPTIMAL):
+            raise ValueError(f"Unknown flower claim mode: {mode}")
+        self.mode = mode
+        self.claimed: set[Flower] = set()
+        self.flowers: list[Flower] = []
+        self._world: ChunkedWorld = None
+        self._radius = 0
+        self._bees = None
+        self._bee_positions = None
+        self._assignment: list[Flower | None] = None
+
+    def reset(self, flowers: list[Flower], radius: int, world: ChunkedWorld):
+        """
+        New episode: flowers (in observation order), the world holding them (keyed by their index) and the vision
+        radius of the colony's bees.
+        """
+        self.claimed.clear()
+        self.flowers = flowers
+        self._world = world
+        self._radius = radius
+        self._bees = None
+        self._bee_positions = None
+        self._assignment = None
+
+    @property
+    def ready(self) -> bool:
+        return self._bee_positions is not None
+
+    # sticky claims
+
+    def is_claimed(self, flower: Flower) -> bool:
+        return flower in self.claimed
+
+    def claim(self, flower: Flower):
+        self.claimed.add(flower)
+
+    def release(self, flower: Flower):
+        self.claimed.remove(flower)
+
+    # per-step assignment
+
+    def new_step(self, bee_positions: list[Coord | None], bees: list):
+        """Snapshot of the colony at observation time; the assignment is computed on the first lookup."""
+        self._bees = bees
+        self._bee_positions = list(bee_positions)
+        self._assignment = None
+
+    def assigned_flower(self, bee_id: int) -> Flower | None:
+        if self._assignment is None:
+            self._assignment = self.__assign()
+        return self._assignment[bee_id]
+
+    def __assign(self) -> list[Flower | None]:
+        assignment: list[Flower | None] = [None] * len(self._bee_positions)
+        present = [bee_id for bee_id, position in enumerate(self._bee_positions) if position is not None]
+        if not present:
+            return assignment
+        visible = self.__visible_pollen(present)
+        if self.mode == OPTIMAL:
+            chosen = self.__optimal(visible)
+        else:
+            chosen = self.__nearest(present, visible)
+        for bee_id, flower_index in chosen.items():
+            assignment[bee_id] = self.flowers[flower_index]
+        return assignment
+
+    def __visible_pollen(self, present: list[int]) -> dict[Coord, tuple[np.ndarray, np.ndarray]]:
+        """Indices and (n, 2) positions of the pollen flowers around each cell holding a bee, in observation order."""
+        visible = {}
+        for bee_id in present:
+            position = self._bee_positions[bee_id]
+            if position in visible:
+                continue
+            found = [
+                (index, flower_position)
+                for index, flower_position in self._world.query(FLOWERS, position, self._radius)
+                if self.flowers[index].pollen
+            ]
+            visible[position] = (
+                np.array([index for index, _ in found], dtype=np.int64),
+                np.array([flower_position for _, flower_position in found], dtype=np.int64).reshape(-1, 2),
+            )
+        return visible
+
+    def __nearest(self, present: list[int], visible: dict) -> dict[int, int]:
+        # nearest visible flower from each cell, ties broken by observation order
+        nearest = {}
+        for position, (indices, flower_positions) in visible.items():
+            if indices.size:
+                distances = np.abs(flower_positions - position).sum(axis=1)
+                best = distances.argmin()
+                nearest[position] = indices[best], flower_positions[best], distances[best]
+
+        # buckets as wide as the vision radius: a bee sees colony bees of its own and the neighbouring buckets only
+        side = max(self._radius, 1)
+        buckets = defaultdict(list)
+        for bee_id in present:
+            x, y = self._bee_positions[bee_id]
+            buckets[(x // side, y // side)].append(bee_id)
+
+        chosen = {}
+        for (bx, by), bucket in buckets.items():
+            seekers = [bee_id for bee_id in bucket if self._bee_positions[bee_id] in nearest]
+            if not seekers:
+                continue
+            others = np.array([
+                bee_id for dx in (-1, 0, 1) for dy in (-1, 0, 1) for bee_id in buckets.get((bx + dx, by + dy), ())
+            ])
+            ids = np.array(seekers)
+            positions = np.array([self._bee_positions[bee_id] for bee_id in seekers], dtype=np.int64)
+            other_positions = np.array([self._bee_positions[bee_id] for bee_id in others], dtype=np.int64)
+            targets = [nearest[self._bee_positions[bee_id]] for bee_id in seekers]
+            target_positions = np.array([target[1] for target in targets], dtype=np.int64)
+            own_distance = np.array([target[2] for target in targets])
+
+            sees = (np.abs(positions[:, None, :] - other_positions[None, :, :]) <= self._radius).all(axis=2)
+            sees &= ids[:, None] != others[None, :]
+            other_distance = np.abs(other_positions[None, :, :] - target_positions[:, None, :]).sum(axis=2)
+            blocked = sees & (
+                (other_distance < own_distance[:, None]) |
+                ((other_distance == own_distance[:, None]) & (others[None, :] < ids[:, None]))
+            )
+            for bee_id, target, is_blocked in zip(seekers, targets, blocked.any(axis=1)):
+                if not is_blocked:
+                    chosen[bee_id] = int(target[0])
+        return chosen
+
+    def __optimal(self, visible: dict) -> dict[int, int]:
+        from scipy.optimize import linear_sum_assignment
+        from scipy.sparse import coo_matrix
+        from scipy.sparse.csgraph import connected_components
+
+        seekers = [
+            bee_id for bee_id, bee in enumerate(self._bees[:len(self._bee_positions)])
+            if bee.is_alive and not bee.pollen and self._bee_positions[bee_id] is not None
+            and visible[self._bee_positions[bee_id]][0].size
+        ]
+        if not seekers:
+            return {}
+        # (seeker, flower, distance) of every visible pair, flowers numbered in observation order
+        columns = np.unique(np.concatenate([visible[self._bee_positions[bee_id]][0] for bee_id in seekers]))
+        rows, cols, distances = [], [], []
+        for row, bee_id in enumerate(seekers):
+            position = self._bee_positions[bee_id]
+            indices, flower_positions = visible[position]
+            rows.append(np.full(indices.size, row))
+            cols.append(np.searchsorted(columns, indices))
+            distances.append(np.abs(flower_positions - position).sum(axis=1))
+        rows, cols, distances = np.concatenate(rows), np.concatenate(cols), np.concatenate(distances)
+
+        # seekers sharing no visible flower are matched independently, one group of overlapping views at a time
+        n_seekers = len(seekers)
+        graph = coo_matrix((np.ones(rows.size), (rows, n_seekers + cols)),
+                           shape=(n_seekers + columns.size,) * 2)
+        _, labels = connected_components(graph, directed=False)
+        unreachable = 2 * self._radius + 1  # farther than any visible flower
+        chosen = {}
+        edge_order = np.argsort(labels[rows], kind="stable")
+        edge_groups = np.split(edge_order, np.flatnonzero(np.diff(labels[rows][edge_order])) + 1)
+        for edges in edge_groups:
+            group_rows, local_rows = np.unique(rows[edges], return_inverse=True)
+            group_cols, local_cols = np.unique(cols[edges], return_inverse=True)
+            costs = np.full((group_rows.size, group_cols.size), unreachable * group_rows.size)
+            costs[local_rows, local_cols] = distances[edges]
+            visible_pairs = np.zeros(costs.shape, dtype=bool)
+            visible_pairs[local_rows, local_cols] = True
+            matched_rows, matched_cols = linear_sum_assignment(costs)
+            for row, col in zip(matched_rows, matched_cols):
+                if visible_pairs[row, col]:
+                    chosen[seekers[group_rows[row]]] = int(columns[group_cols[col]])
+        return chosen
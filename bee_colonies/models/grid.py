@@ -1,26 +1,22 @@
 import numpy as np
 import pygame as pg
-from config import get_config
-
-CONFIG = get_config()
-# dark green
-BACKGROUND_COLOR = tuple(CONFIG["background_color"])
-
-COLORS = {
-    "F": tuple(CONFIG["flower_color"]),  # pink - flower
-    "R": tuple(CONFIG["restoring_pollen_flower_color"]),  # brown - flower regeneration pollen
-    "H": tuple(CONFIG["hive_color"]),  # red - beehive
-    "W": tuple(CONFIG["wasp_color"]),  # orange - wasp
-    "B": tuple(CONFIG["bee_color"]),  # yellow - bee
-}
-
-TICK_RATE = CONFIG["tick_rate"]
+from config import Config, get_config
 
 
 class Grid:
-    def __init__(self, width, height):
-        self.empty = np.array([[" " for _ in range(width)] for _ in range(height)])
-        self.grid = np.array([[" " for _ in range(width)] for _ in range(height)])
+    def __init__(self, width, height, config: Config = None):
+        config = config or get_config()
+        self.background_color = config.background_color  # dark green
+        self.colors = {
+            "F": config.flower_color,  # pink - flower
+            "R": config.restoring_pollen_flower_color,  # brown - flower regeneration pollen
+            "H": config.hive_color,  # red - beehive
+            "W": config.wasp_color,  # orange - wasp
+            "B": config.bee_color,  # yellow - bee
+            "T": config.terrain_color,  # grey - impassable terrain
+        }
+        self.tick_rate = config.tick_rate
+        self.cells: dict[tuple[int, int], str] = {}  # only occupied cells, by (x, y)
         self.uwidth = width
         self.uheight = height
         self.screen_size = (600, 600)
@@ -29,29 +25,30 @@ class Grid:
         pg.init()
         self.screen = pg.display.set_mode(self.screen_size)
         pg.display.set_caption("Bee Colonies")
-        self.screen.fill(BACKGROUND_COLOR)
+        self.screen.fill(self.background_color)
 
-    def populate(self, flowers, bees_by_colonies, beehives, wasps):
-        self.grid = self.empty.copy()
+    def populate(self, flowers, bees_by_colonies, beehives, wasps, terrain=None):
+        self.cells = {}
+        if terrain is not None:
+            self.cells.update((tuple(cell), "T") for cell in np.argwhere(~terrain.passable).tolist())
         for flower_position, flower in flowers.items():
-            self.grid[flower_position[0], flower_position[1]] = "F" if flower.pollen else "R"
+            self.cells[flower_position] = "F" if flower.pollen else "R"
         for colony in bees_by_colonies:
             for bee in colony:
-                self.grid[bee[0], bee[1]] = "B"
+                if bee is not None:
+                    self.cells[bee] = "B"
         for beehive in beehives:
-            self.grid[beehive[0], beehive[1]] = "H"
+            self.cells[beehive] = "H"
         for wasp in wasps:
-            self.grid[wasp[0], wasp[1]] = "W"
+            self.cells[wasp] = "W"
 
     def render(self):
-        self.screen.fill(BACKGROUND_COLOR)
-        for i in range(self.uwidth):
-            for j in range(self.uheight):
-                if self.grid[j][i] != " ":
-                    pg.draw.rect(self.screen, COLORS[self.grid[j][i]],
-                                 (i * self.cell_size, j * self.cell_size, self.cell_size, self.cell_size))
+        self.screen.fill(self.background_color)
+        for (x, y), cell in self.cells.items():
+            pg.draw.rect(self.screen, self.colors[cell],
+                         (y * self.cell_size, x * self.cell_size, self.cell_size, self.cell_size))
         pg.display.update()
-        # with np.printoptions(threshold=np.inf):
-        #     for row in self.grid:
-        #         print(" ".join(row))
-        self.clock.tick(TICK_RATE)
+        self.clock.tick(self.tick_rate)
+
+    def close(self):
+        pg.display.quit()
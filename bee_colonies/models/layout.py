@@ -0,0 +1,69 @@
+"""
+Pre-generated world layouts stored as memory-mapped files.
+
+A layout is a folder holding:
+- layout.json: grid shape, flower cluster centers and number of flowers
+- flowers.npy: (n_flowers, 2) int32 flower coordinates, in the order the environment creates its flowers
+- occupancy.npy: (width, height) uint8 layer, FLOWER_CELL where a flower grows
+
+Arrays are opened with np.load(mmap_mode='r'), so opening a layout takes constant time whatever the grid size,
+and worker processes reading the same layout share its pages through the OS cache.
+"""
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+
+Coord = tuple[int, int]
+
+EMPTY_CELL, FLOWER_CELL = 0, 1
+
+METADATA_FILE, FLOWERS_FILE, OCCUPANCY_FILE = "layout.json", "flowers.npy", "occupancy.npy"
+
+
+class Layout:
+    def __init__(self, grid_shape: Coord, clusters: list[Coord], flowers: np.ndarray, occupancy: np.ndarray):
+        self.grid_shape = grid_shape
+        self.clusters = clusters
+        self.flowers = flowers
+        self.occupancy = occupancy
+
+    def flower_coordinates(self) -> list[Coord]:
+        return list(zip(*self.flowers.T.tolist()))
+
+    def has_flower(self, position: Coord) -> bool:
+        return self.occupancy[position] == FLOWER_CELL
+
+
+def save_layout(path: str, grid_shape: Coord, clusters: list[Coord], flower_coordinates: list[Coord]):
+    """Writes a layout folder; the occupancy layer is filled through a memory map, never held in RAM."""
+    os.makedirs(path, exist_ok=True)
+    flowers = np.array(flower_coordinates, dtype=np.int32).reshape(-1, 2)
+    np.save(os.path.join(path, FLOWERS_FILE), flowers)
+
+    occupancy = np.lib.format.open_memmap(os.path.join(path, OCCUPANCY_FILE), mode="w+", dtype=np.uint8,
+                                          shape=tuple(grid_shape))
+    occupancy[flowers[:, 0], flowers[:, 1]] = FLOWER_CELL
+    occupancy.flush()
+    del occupancy
+
+    with open(os.path.join(path, METADATA_FILE), "w") as file:
+        json.dump({
+            "grid_shape": list(grid_shape),
+            "clusters": [list(map(int, cluster)) for cluster in clusters],
+            "n_flowers": len(flowers),
+        }, file, indent=4)
+
+
+@lru_cache(maxsize=None)
+def load_layout(path: str) -> Layout:
+    """Opens a layout read-only, once per path."""
+    with open(os.path.join(path, METADATA_FILE), "r") as file:
+        metadata = json.load(file)
+    return Layout(
+        grid_shape=tuple(metadata["grid_shape"]),
+        clusters=[tuple(cluster) for cluster in metadata["clusters"]],
+        flowers=np.load(os.path.join(path, FLOWERS_FILE), mmap_mode="r"),
+        occupancy=np.load(os.path.join(path, OCCUPANCY_FILE), mmap_mode="r"),
+    )
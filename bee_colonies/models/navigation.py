@@ -0,0 +1,212 @@
+from collections import OrderedDict
+
+import numpy as np
+
+Coord = tuple[int, int]
+
+# same values as BEE_* and WASP_* moves
+STAY, UP, DOWN, LEFT, RIGHT = range(5)
+
+
+def manhattan_distances(src: np.ndarray, dest: np.ndarray) -> np.ndarray:
+    """
+    Manhattan distances between arrays of coordinates, shaped (..., 2).
+    src and dest are broadcast against each other, e.g. (N, 2) sources against a single (2,) destination.
+    """
+    return np.abs(np.asarray(dest) - np.asarray(src)).sum(axis=-1)
+
+
+def moves_towards(src: np.ndarray, dest: np.ndarray) -> np.ndarray:
+    """Vectorized move_towards: the move taking each src one step closer to its dest."""
+    src, dest = np.asarray(src), np.asarray(dest)
+    x1, y1 = src[..., 0], src[..., 1]
+    x2, y2 = dest[..., 0], dest[..., 1]
+    dx, dy = np.abs(x2 - x1), np.abs(y2 - y1)
+    moves = np.where(
+        dx > dy,
+        np.where(x2 < x1, UP, DOWN),
+        np.where(y2 < y1, LEFT, RIGHT)
+    ).astype(np.int8)
+    moves[(dx == 0) & (dy == 0)] = STAY
+    return moves
+
+
+def direction_field(grid_shape: Coord, target: Coord) -> np.ndarray:
+    """
+    Greedy move towards target from every cell of the grid, as an int8 array indexed by (x, y).
+    path_direction_field prefers it among equally short paths.
+    """
+    cells = np.stack(np.indices(grid_shape), axis=-1)
+    return moves_towards(cells, target)
+
+
+UNREACHABLE = np.iinfo(np.int32).max // 4
+
+# (move, dx, dy) of the moves out of a cell
+MOVE_OFFSETS = ((UP, -1, 0), (DOWN, 1, 0), (LEFT, 0, -1), (RIGHT, 0, 1))
+
+
+def distance_field(cost: np.ndarray, sources: list[Coord]) -> np.ndarray:
+    """
+    Multi-source shortest path costs: for every cell, the cost of the cheapest path to the nearest source,
+    paying cost[cell] to enter each cell (0 is impassable). Unreachable cells are UNREACHABLE.
+    Searches outwards from the sources, settling each cell once: breadth-first when every open cell costs 1,
+    with Dijkstra otherwise.
+    """
+    passable = cost != 0
+    if (cost[passable] == 1).all():
+        return _breadth_first_distances(passable, sources)
+    return _dijkstra_distances(cost, sources)
+
+
+def _breadth_first_distances(passable: np.ndarray, sources: list[Coord]) -> np.ndarray:
+    """Unit costs: the distance of a cell is the BFS level it is reached at, one frontier array per level."""
+    width, height = passable.shape
+    distances = np.full(passable.shape, UNREACHABLE, dtype=np.int32)
+    flat_distances, flat_passable = distances.reshape(-1), passable.reshape(-1)
+    for source in sources:
+        distances[source] = 0
+    frontier = np.array([x * height + y for x, y in sources if passable[x, y]], dtype=np.intp)
+    level = 0
+    while frontier.size:
+        level += 1
+        x, y = np.divmod(frontier, height)
+        neighbours = np.concatenate((
+            frontier[x > 0] - height, frontier[x < width - 1] + height,
+            frontier[y > 0] - 1, frontier[y < height - 1] + 1,
+        ))
+        neighbours = neighbours[flat_passable[neighbours] & (flat_distances[neighbours] == UNREACHABLE)]
+        frontier = np.unique(neighbours)
+        flat_distances[frontier] = level
+    return distances
+
+
+def _dijkstra_distances(cost: np.ndarray, sources: list[Coord]) -> np.ndarray:
+    """Weighted costs: Dijkstra from the sources over the grid graph, leaving a cell costing what it costs to enter."""
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import dijkstra
+
+    width, height = cost.shape
+    index = np.arange(cost.size).reshape(cost.shape)
+    passable = cost != 0
+    origins, ends = [], []
+    for _, dx, dy in MOVE_OFFSETS:
+        # pairs of neighbouring open cells, searched from the source side
+        origin = index[max(0, -dx):width - max(0, dx), max(0, -dy):height - max(0, dy)]
+        end = index[max(0, dx):width - max(0, -dx), max(0, dy):height - max(0, -dy)]
+        both = passable.reshape(-1)[origin] & passable.reshape(-1)[end]
+        origins.append(origin[both])
+        ends.append(end[both])
+    origins, ends = np.concatenate(origins), np.concatenate(ends)
+    graph = coo_matrix((cost.reshape(-1)[origins].astype(np.float64), (origins, ends)),
+                       shape=(cost.size, cost.size)).tocsr()
+
+    distances = np.full(cost.shape, UNREACHABLE, dtype=np.int32)
+    open_sources = [x * height + y for x, y in sources if passable[x, y]]
+    if open_sources:
+        found = dijkstra(graph, directed=True, indices=open_sources, min_only=True)
+        reached = np.isfinite(found)
+        distances.reshape(-1)[reached] = found[reached].astype(np.int32)
+    for source in sources:
+        distances[source] = 0
+    return distances
+
+
+def path_direction_field(cost: np.ndarray, sources: list[Coord]) -> np.ndarray:
+    """
+    First move of a shortest path from every cell to the nearest source, as an int8 array indexed by (x, y).
+    Among equally short paths the greedy move (move_towards) is preferred for single sources;
+    sources and cells without a path stay.
+    """
+    distances = distance_field(cost, sources)
+    options = _neighbour_costs(distances, cost)
+    best = options.min(axis=0)
+    moves = np.array([move for move, _, _ in MOVE_OFFSETS], dtype=np.int8)[options.argmin(axis=0)]
+    if len(sources) == 1:
+        greedy = direction_field(cost.shape, sources[0])
+        greedy_cost = np.take_along_axis(options, np.clip(greedy - 1, 0, 3)[None].astype(np.intp), axis=0)[0]
+        moves = np.where((greedy != STAY) & (greedy_cost == best), greedy, moves)
+    moves[(distances == 0) | (best >= UNREACHABLE)] = STAY
+    return moves
+
+
+def _neighbour_costs(distances: np.ndarray, cost: np.ndarray) -> np.ndarray:
+    """(4, x, y) cost of reaching a source through each neighbour, in MOVE_OFFSETS order."""
+    through = np.where(cost != 0, distances + cost, UNREACHABLE)
+    padded = np.pad(through, 1, constant_values=UNREACHABLE)
+    width, height = cost.shape
+    return np.minimum(np.stack([
+        padded[1 + dx:1 + dx + width, 1 + dy:1 + dy + height] for _, dx, dy in MOVE_OFFSETS
+    ]), UNREACHABLE)
+
+
+DEFAULT_OTHER_FIELDS_BYTES = 64 * 2 ** 20
+
+
+class FlowFields:
+    """
+    Per-episode cache of direction fields towards static targets (the beehives), and lazily towards any other
+    target (flowers) when the terrain makes greedy moves wrong.
+    Agents heading to a cached target read their next move from a table instead of recomputing it.
+    Fields are recomputed only when the terrain changes. Fields towards other targets are kept for the most recently
+    used targets only, within other_fields_bytes, so memory does not grow with every flower visited.
+
+    On an open (or uniform) field, greedy moves are shortest paths: no table is kept, and agents compute them directly.
+    """
+
+    def __init__(self, other_fields_bytes: int = DEFAULT_OTHER_FIELDS_BYTES):
+        self.other_fields_bytes = other_fields_bytes
+        self.grid_shape: Coord = None
+        self.terrain = None
+        self.targets: set[Coord] = set()
+        self.fields: dict[Coord, np.ndarray] = {}
+        self.other_fields: OrderedDict[Coord, np.ndarray] = OrderedDict()  # least recently used first
+        self._terrain_version = None
+        self._stale = True
+        self._uniform = True
+
+    def reset(self, grid_shape: Coord, targets: list[Coord], terrain=None):
+        self.grid_shape = grid_shape
+        self.terrain = terrain
+        self.targets = set(targets)
+        self._stale = True
+        self.__refresh()
+
+    def field(self, target: Coord) -> np.ndarray | None:
+        """Shortest path moves towards target over the whole grid, None where greedy moves are as good."""
+        self.__refresh()
+        if self._uniform:
+            return None
+        field = self.fields.get(target)
+        if field is not None:
+            return field
+        field = self.other_fields.get(target)
+        if field is not None:
+            self.other_fields.move_to_end(target)
+            return field
+        field = self.other_fields[target] = path_direction_field(self.terrain.cost, [target])
+        if len(self.other_fields) * field.nbytes > self.other_fields_bytes:
+            self.other_fields.popitem(last=False)
+        return field
+
+    def move(self, position: Coord, target: Coord) -> int | None:
+        """Next move from position towards target, None when the greedy move (move_towards) is just as good."""
+        if self.terrain is None:
+            return None
+        self.__refresh()
+        if self._uniform:
+            return None
+        return int(self.field(target)[position])
+
+    def __refresh(self):
+        version = self.terrain.version if self.terrain is not None else None
+        if not self._stale and version == self._terrain_version:
+            return
+        self._stale = False
+        self._terrain_version = version
+        self._uniform = self.terrain is None or self.terrain.is_uniform()
+        self.other_fields.clear()
+        if self._uniform:
+            self.fields = {}
+        else:
+            self.fields = {target: path_direction_field(self.terrain.cost, [target]) for target in self.targets}
@@ -1,39 +1,66 @@
 from bee_colonies.models.bee import Bee, BEE_STAY, BEE_ATTACK
 from bee_colonies.models.agent import Agent
+from bee_colonies.models.flower_claims import FlowerClaims
+from bee_colonies.models.roster import ColonyRoster, put_in_slot
+from bee_colonies.models.spaces import MultiBinaryActions
 import numpy as np
-from gym.spaces import MultiBinary
-from config import get_config
-
-CONFIG = get_config()
-# FINE TUNE ARGUMENTS
-STARTING_FOOD_QUANTITY_PER_BEE = CONFIG["starting_food_quantity_per_bee"]
-CONSUMED_FOOD_PER_TURN_PER_BEE = CONFIG["consumed_food_per_turn_per_bee"]
-FOOD_QUANTITY_PER_POLLEN = CONFIG["food_quantity_per_pollen"]
-IS_GOOD_HEALTH = lambda health_score: health_score > CONFIG["good_health_threshold"]
-IS_BAD_HEALTH = lambda health_score: health_score < CONFIG["bad_health_threshold"]
-TENDENCY_THRESHOLD = CONFIG["tendency_threshold"]
+from config import Config, get_config
+
 HEALTH_SCORE_FUNCTION = lambda food_quantity, no_bees: food_quantity // no_bees if no_bees > 0 else 0
 
 
 class QueenBee(Agent):
-    def __init__(self, id: int, bees: list[Bee], new_bee_class):
+    # the action space follows the size of the colony, so each queen has its own
+    __slots__ = ("config", "id", "bees", "alive_bees", "dead_count", "roster", "food_quantity", "received",
+                 "action_space", "health_tendency_counter", "new_bee", "flower_claims", "flow_fields")
+
+    def __init__(self, id: int, bees: list[Bee], new_bee_class, config: Config = None):
         super().__init__()
+        self.config = config or get_config()
         n_bees = len(bees)
         self.id = id
         self.is_alive = True
         self.bees = bees
         self.alive_bees = n_bees
-        self.presence_array = np.ones(n_bees)
-        self.food_quantity = STARTING_FOOD_QUANTITY_PER_BEE * n_bees
+        self.dead_count = 0
+        self.roster = ColonyRoster(n_bees)
+        self.food_quantity = self.config.starting_food_quantity_per_bee * n_bees
         self.received = 0
         self.last_observation = None
         self.mask = None
-        self.action_space = MultiBinary(n_bees)
+        self.action_space = MultiBinaryActions(n_bees)
         self.health_tendency_counter = 0
         self.new_bee = new_bee_class
-        # used by social bees
-        self.pursuing_flower_map = dict()
-        self.section_size = None
+        # used by social and respectful bees
+        self.flower_claims = FlowerClaims(self.config.flower_claim_mode)
+        # navigation of the colony's bees, shared by the environment on reset
+        self.flow_fields = None
+
+    def reset(self, n_bees: int = None):
+        """
+        Back to a new colony of n_bees bees (by default, as many as it has slots), in place: the bees of the first
+        n_bees slots are reset and reused, bees born in later slots are dropped.
+        """
+        super().reset()
+        n_bees = len(self.bees) if n_bees is None else n_bees
+        del self.bees[n_bees:]
+        for bee in self.bees:
+            bee.reset()
+        self.alive_bees = n_bees
+        self.dead_count = 0
+        self.roster.reset(n_bees)
+        self.food_quantity = self.config.starting_food_quantity_per_bee * n_bees
+        self.received = 0
+        self.action_space.resize(n_bees)
+        self.health_tendency_counter = 0
+
+    @property
+    def presence_array(self) -> np.ndarray:
+        return self.roster.presence
+
+    @presence_array.setter
+    def presence_array(self, value):
+        self.roster.presence = value
 
     def action(self) -> np.ndarray:
         """
@@ -42,6 +69,12 @@ class QueenBee(Agent):
         """
         return self.action_space.sample(mask=self.mask)
 
+    def is_good_health(self, health_score) -> bool:
+        return health_score > self.config.good_health_threshold
+
+    def is_bad_health(self, health_score) -> bool:
+        return health_score < self.config.bad_health_threshold
+
     def __repr__(self):
         return f"Queen Bee {self.id} with {self.food_quantity} units of food"
 
@@ -53,37 +86,37 @@ class QueenBee(Agent):
     def receive_polen(self):
         """Queen Bee receives polen from a bee."""
         self.received += 1
-        self.food_quantity += FOOD_QUANTITY_PER_POLLEN
+        self.food_quantity += self.config.food_quantity_per_pollen
 
     def timestep(self) -> tuple[Bee, bool]:
         """Queen Bee's health decreases by the consumed food per turn per bee."""
         if not self.is_alive:
             return None, False
-        total_no_bees = len(self.bees)
         if self.alive_bees <= 0:
             self.is_alive = False
             self.__purge_bees()
             return None, False
-        self.food_quantity -= CONSUMED_FOOD_PER_TURN_PER_BEE * self.alive_bees
+        self.food_quantity -= self.config.consumed_food_per_turn_per_bee * self.alive_bees
         if self.food_quantity < 0:
             self.is_alive = False
             self.__purge_bees()
             return None, False
         health_score = HEALTH_SCORE_FUNCTION(self.food_quantity, self.alive_bees)
-        if IS_GOOD_HEALTH(health_score):
+        if self.is_good_health(health_score):
             self.health_tendency_counter = max(self.health_tendency_counter + 1, 1)
-        elif IS_BAD_HEALTH(health_score):
+        elif self.is_bad_health(health_score):
             self.health_tendency_counter = min(self.health_tendency_counter - 1, -1)
         else:
             self.health_tendency_counter = 0
-        if self.health_tendency_counter >= TENDENCY_THRESHOLD:
-            self.presence_array = np.append(self.presence_array, 1)
-            new_bee = self.new_bee(total_no_bees)
+        if self.health_tendency_counter >= self.config.tendency_threshold:
+            slot = self.roster.add()
+            new_bee = self.new_bee(slot, config=self.config)
             new_bee.set_queen(self)
-            self.action_space = MultiBinary(total_no_bees + 1)
+            put_in_slot(self.bees, slot, new_bee)
+            self.action_space.resize(self.roster.size)
             self.alive_bees += 1
             return new_bee, True
-        elif self.health_tendency_counter <= -TENDENCY_THRESHOLD:
+        elif self.health_tendency_counter <= -self.config.tendency_threshold:
             # sacrifices a bee, preferably if they're inside the beehive
             picked_index = self.__pick_bee_to_sacrifice()
             self.dead_bee(picked_index)
@@ -94,14 +127,17 @@ class QueenBee(Agent):
         bee.mask = np.zeros(bee.action_space.n)
         bee.mask[BEE_STAY] = 1
         bee.mask[BEE_ATTACK] = 1
-        self.presence_array[bee.local_beehive_id] = 1
+        self.roster.arrive(bee.local_beehive_id)
 
     def dead_bee(self, id: int):
         self.alive_bees -= 1
-        self.presence_array[id] = 0
+        self.dead_count += 1
+        self.roster.remove(id)
 
     def __purge_bees(self):
+        self.dead_count += self.alive_bees
         self.alive_bees = 0
+        self.roster.clear()
         for bee in self.bees:
             bee.is_alive = False
 
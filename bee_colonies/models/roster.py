@@ -0,0 +1,108 @@
+import numpy as np
+
+
+class ColonyRoster:
+    """
+    Keeps track of the bee slots of a colony.
+    Slots are backed by capacity-doubling arrays, so births and deaths are amortized O(1).
+    Slots are never reused: a newborn bee always takes a new slot, so a bee's slot is also its id, increasing with
+    birth order (bees break ties on it).
+
+    Attributes
+    ----------
+    size: int
+        Number of slots in use (alive or free), i.e. the length of the colony's bee list.
+
+    presence: np.ndarray
+        View over the presence of each slot (1: inside the beehive, 0: outside or dead).
+
+    alive: np.ndarray
+        View over the liveness of each slot.
+
+    present: int
+        Number of bees inside the beehive, kept up to date by the methods changing presence.
+    """
+
+    def __init__(self, n_bees: int):
+        capacity = max(n_bees, 1)
+        self._presence = np.zeros(capacity, dtype=np.int8)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self.size = 0
+        self.present = 0
+        self.reset(n_bees)
+
+    def reset(self, n_bees: int):
+        """Every slot is taken by an alive bee present in the beehive."""
+        self._grow(n_bees)
+        self._presence[:] = 0
+        self._alive[:] = False
+        self._presence[:n_bees] = 1
+        self._alive[:n_bees] = True
+        self.size = n_bees
+        self.present = n_bees
+
+    @property
+    def capacity(self) -> int:
+        return self._presence.size
+
+    @property
+    def presence(self) -> np.ndarray:
+        return self._presence[:self.size]
+
+    @presence.setter
+    def presence(self, value):
+        self._presence[:self.size] = value
+        self.present = int(np.count_nonzero(self._presence[:self.size]))
+
+    def arrive(self, slot: int):
+        """The bee of the slot enters the beehive."""
+        if not self._presence[slot]:
+            self._presence[slot] = 1
+            self.present += 1
+
+    @property
+    def alive(self) -> np.ndarray:
+        return self._alive[:self.size]
+
+    def add(self) -> int:
+        """Takes a slot for a newborn bee, present in the beehive. Returns the slot index."""
+        slot = self.size
+        self._grow(slot + 1)
+        self.size += 1
+        self._presence[slot] = 1
+        self._alive[slot] = True
+        self.present += 1
+        return slot
+
+    def remove(self, slot: int):
+        """The bee of the slot dies; its slot stays in the roster."""
+        if self._presence[slot]:
+            self._presence[slot] = 0
+            self.present -= 1
+        self._alive[slot] = False
+
+    def clear(self):
+        """Every bee of the colony is dead."""
+        for slot in np.flatnonzero(self.alive):
+            self.remove(int(slot))
+
+    def _grow(self, needed: int):
+        if needed <= self.capacity:
+            return
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        presence = np.zeros(capacity, dtype=np.int8)
+        alive = np.zeros(capacity, dtype=bool)
+        presence[:self.size] = self._presence[:self.size]
+        alive[:self.size] = self._alive[:self.size]
+        self._presence = presence
+        self._alive = alive
+
+
+def put_in_slot(items: list, slot: int, item):
+    """Places an item at the given slot of a list, appending if the slot is right after the last one."""
+    if slot == len(items):
+        items.append(item)
+    else:
+        items[slot] = item
@@ -11,6 +11,8 @@ class SearchingGuide:
     If the agent hits an obstacle, it will change direction.
     """
 
+    __slots__ = ("moves", "intent", "current_direction", "last_position", "steps")
+
     def __init__(self, moves, intent) -> None:
         """
         Moves should be like: [*_UP, *_DOWN, *_LEFT, *_RIGHT]
@@ -21,6 +23,11 @@ class SearchingGuide:
         self.last_position = None
         self.steps = 0
 
+    def reset(self):
+        self.current_direction = None
+        self.last_position = None
+        self.steps = 0
+
     def walk(self, position: Coord) -> int:
         """
         Walk in the current direction. If the agent has walked the number of steps it intended to, it will change
@@ -0,0 +1,93 @@
+import numpy as np
+
+
+class DiscreteActions:
+    """
+    Lightweight discrete action space: {0, 1, ..., n - 1}.
+    Masks follow gym's convention: 1 means the action is possible, 0 means it is not.
+    If no action is possible, 0 (stay) is sampled.
+    """
+
+    def __init__(self, n: int, seed=None):
+        self.n = int(n)
+        self.np_random = np.random.default_rng(seed)
+
+    @property
+    def shape(self) -> tuple:
+        return ()
+
+    def sample(self, mask: np.ndarray = None, rng: np.random.Generator = None) -> int:
+        rng = self.np_random if rng is None else rng
+        if mask is None:
+            return int(rng.integers(self.n))
+        possible = np.flatnonzero(mask)
+        if possible.size == 0:
+            return 0
+        return int(rng.choice(possible))
+
+    def sample_batch(self, masks: np.ndarray, rng: np.random.Generator = None) -> np.ndarray:
+        """Samples one action per row of masks, shaped (n_agents, n)."""
+        rng = self.np_random if rng is None else rng
+        masks = np.asarray(masks)
+        # the possible action with the highest random score is uniformly distributed among possible actions
+        scores = rng.random(masks.shape)
+        scores[masks == 0] = -1
+        actions = scores.argmax(axis=1)
+        actions[~masks.any(axis=1)] = 0
+        return actions
+
+    def contains(self, x) -> bool:
+        return isinstance(x, (int, np.integer)) and 0 <= x < self.n
+
+    def to_gymnasium(self):
+        from gymnasium.spaces import Discrete
+        return Discrete(self.n)
+
+    def __repr__(self):
+        return f"DiscreteActions({self.n})"
+
+
+class MultiBinaryActions:
+    """
+    Lightweight multi binary action space: {0, 1}^n.
+    Masks follow gym's convention: 0 or 1 force the value, 2 means it is sampled.
+    The size can change in place, since it follows the size of a colony.
+    """
+
+    def __init__(self, n: int, seed=None):
+        self.n = int(n)
+        self.np_random = np.random.default_rng(seed)
+
+    @property
+    def shape(self) -> tuple:
+        return (self.n,)
+
+    def resize(self, n: int):
+        self.n = int(n)
+
+    def sample(self, mask: np.ndarray = None, rng: np.random.Generator = None) -> np.ndarray:
+        rng = self.np_random if rng is None else rng
+        sample = rng.integers(0, 2, size=self.n, dtype=np.int8)
+        if mask is None:
+            return sample
+        return np.where(mask == 2, sample, mask).astype(np.int8)
+
+    def sample_batch(self, masks: list[np.ndarray], rng: np.random.Generator = None) -> list[np.ndarray]:
+        """Samples one action per mask, the masks may have different sizes."""
+        rng = self.np_random if rng is None else rng
+        if not masks:
+            return []
+        flat_masks = np.concatenate(masks)
+        flat = np.where(flat_masks == 2, rng.integers(0, 2, size=flat_masks.size, dtype=np.int8), flat_masks)
+        return np.split(flat.astype(np.int8), np.cumsum([mask.size for mask in masks])[:-1])
+
+    def contains(self, x) -> bool:
+        x = np.asarray(x)
+        return x.shape == self.shape and bool(np.all((x == 0) | (x == 1)))
+
+    def to_gymnasium(self):
+        from gymnasium.spaces import MultiBinary
+        return MultiBinary(self.n)
+
+    def __repr__(self):
+        return f"MultiBinaryActions({self.n})"
@@ -0,0 +1,88 @@
+from functools import lru_cache
+
+import numpy as np
+
+Coord = tuple[int, int]
+
+# bitmap characters, one line per grid row (x), one character per column (y)
+OPEN_CELL, IMPASSABLE_CELL = ".", "#"
+IMPASSABLE = 0  # cost of impassable cells; open cells cost 1 to 9
+
+
+class Terrain:
+    """
+    Terrain layer of the grid: impassable cells and the cost of entering each open cell.
+    Every change bumps `version`, so cached paths know when to be recomputed.
+    """
+
+    def __init__(self, cost: np.ndarray):
+        self.cost = np.asarray(cost, dtype=np.int32)
+        self.version = 0
+        self._move_masks = None
+        self._move_masks_version = None
+
+    @classmethod
+    def open(cls, grid_shape: Coord) -> "Terrain":
+        return cls(np.ones(grid_shape, dtype=np.int32))
+
+    @property
+    def shape(self) -> Coord:
+        return self.cost.shape
+
+    @property
+    def passable(self) -> np.ndarray:
+        return self.cost != IMPASSABLE
+
+    def is_passable(self, position: Coord) -> bool:
+        return self.cost[position] != IMPASSABLE
+
+    def is_uniform(self) -> bool:
+        """True when every cell is open with cost 1, where greedy moves are shortest paths."""
+        return bool((self.cost == 1).all())
+
+    def set_cost(self, position: Coord, cost: int):
+        self.cost[position] = cost
+        self.version += 1
+
+    def move_masks(self) -> np.ndarray:
+        """
+        (x, y, 5) int8 array: 1 where the move (stay, up, down, left, right) from the cell
+        does not enter an impassable cell. Moves off the grid are left to clamping.
+        """
+        if self._move_masks_version != self.version:
+            blocked = np.pad(~self.passable, 1, constant_values=False)
+            masks = np.ones((*self.shape, 5), dtype=np.int8)
+            masks[..., 1] = ~blocked[:-2, 1:-1]
+            masks[..., 2] = ~blocked[2:, 1:-1]
+            masks[..., 3] = ~blocked[1:-1, :-2]
+            masks[..., 4] = ~blocked[1:-1, 2:]
+            self._move_masks = masks
+            self._move_masks_version = self.version
+        return self._move_masks
+
+
+def parse_terrain(lines: list[str], grid_shape: Coord) -> np.ndarray:
+    """Cost array from bitmap lines; cells missing from the bitmap are open."""
+    cost = np.ones(grid_shape, dtype=np.int32)
+    for x, line in enumerate(lines[:grid_shape[0]]):
+        for y, cell in enumerate(line.rstrip("\n")[:grid_shape[1]]):
+            if cell == IMPASSABLE_CELL:
+                cost[x, y] = IMPASSABLE
+            elif cell.isdigit() and cell != "0":
+                cost[x, y] = int(cell)
+            elif cell != OPEN_CELL:
+                raise ValueError(f"Unknown terrain cell {cell!r} at ({x}, {y})")
+    return cost
+
+
+@lru_cache(maxsize=None)
+def _read_terrain(file_path: str, grid_shape: Coord) -> np.ndarray:
+    with open(file_path, "r") as file:
+        cost = parse_terrain(file.readlines(), grid_shape)
+    cost.flags.writeable = False
+    return cost
+
+
+def load_terrain(file_path: str, grid_shape: Coord) -> Terrain:
+    """Reads a terrain bitmap once per path; every call returns a fresh, modifiable terrain."""
+    return Terrain(_read_terrain(file_path, tuple(grid_shape)).copy())
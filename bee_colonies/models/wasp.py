@@ -1,28 +1,37 @@
 import numpy as np
 from bee_colonies.models.queen_bee import QueenBee
 from bee_colonies.models.agent import Agent
-from gym.spaces import Discrete
-from config import get_config
+from bee_colonies.models.spaces import DiscreteActions
+from config import Config, get_config
 
-CONFIG = get_config()
 # 0: stay still, 1: move up, 2: move down, 3: move left, 4: move right, 5: attack
 WASP_STAY, WASP_UP, WASP_DOWN, WASP_LEFT, WASP_RIGHT, WASP_ATTACK, WASP_N_ACTIONS = range(7)
 
-# FINE TUNE ARGUMENTS
-WASP_LIFE_POINTS = CONFIG["wasp_life_points"]
-WASP_ATTACK_POWER = CONFIG["wasp_attack_power"]
-
 
 Coord = tuple[int, int]
 
 class Wasp(Agent):
-    def __init__(self, id):
+    __slots__ = ("config", "id", "health", "attack_power", "flow_fields")
+
+    action_space = DiscreteActions(WASP_N_ACTIONS)
+
+    def __init__(self, id, config: Config = None):
         super().__init__()
+        self.config = config or get_config()
         self.id = id
-        self.health = WASP_LIFE_POINTS
+        self.health = self.config.wasp_life_points
         self.is_alive = True
-        self.attack_power = WASP_ATTACK_POWER
-        self.action_space = Discrete(WASP_N_ACTIONS)
+        self.attack_power = self.config.wasp_attack_power
+        self.flow_fields = None  # set by the environment on reset
+
+    def move_to(self, position: Coord, target: Coord) -> int:
+        """Move towards target, read from the cached direction fields when available."""
+        move = self.flow_fields.move(position, target) if self.flow_fields is not None else None
+        return move_towards(position, target) if move is None else move
+
+    def reset(self):
+        super().reset()
+        self.health = self.config.wasp_life_points
 
     def receive_damage(self, damage):
         """
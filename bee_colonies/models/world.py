@@ -0,0 +1,111 @@
+from collections import defaultdict
+
+Coord = tuple[int, int]
+ChunkCoord = tuple[int, int]
+
+FLOWERS, BEEHIVES, BEES, WASPS = "flowers", "beehives", "bees", "wasps"
+
+DEFAULT_CHUNK_SIZE = 16
+
+
+class ChunkedWorld:
+    """
+    Sparse store of what occupies the grid, split in square chunks of chunk_size x chunk_size cells.
+    Only chunks holding a flower, a beehive or an agent exist, so memory scales with the content of the world
+    rather than with its area.
+
+    Each layer (flowers, beehives, bees, wasps) maps a key to a position. Keys order the results of queries,
+    e.g. flowers by creation order and bees by (colony, local id).
+    """
+
+    def __init__(self, grid_shape: Coord, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.grid_shape = grid_shape
+        self.chunk_size = chunk_size
+        # chunk -> layer -> {key: position}
+        self.chunks: dict[ChunkCoord, dict[str, dict]] = defaultdict(lambda: defaultdict(dict))
+        self.layers: dict[str, set[ChunkCoord]] = defaultdict(set)  # chunks holding something of each layer
+
+    def chunk_of(self, position: Coord) -> ChunkCoord:
+        return position[0] // self.chunk_size, position[1] // self.chunk_size
+
+    def add(self, layer: str, key, position: Coord):
+        if position is None:
+            return
+        chunk = self.chunk_of(position)
+        self.chunks[chunk][layer][key] = position
+        self.layers[layer].add(chunk)
+
+    def remove(self, layer: str, key, position: Coord):
+        if position is None:
+            return
+        chunk = self.chunk_of(position)
+        content = self.chunks[chunk]
+        del content[layer][key]
+        if not content[layer]:
+            del content[layer]
+            self.layers[layer].discard(chunk)
+            if not content:
+                del self.chunks[chunk]
+
+    def move(self, layer: str, key, old: Coord, new: Coord):
+        """Moves an item between positions; None stands for not being on the grid."""
+        self.remove(layer, key, old)
+        self.add(layer, key, new)
+
+    def clear(self, layer: str):
+        """Empties a layer, dropping the chunks left without content."""
+        for chunk in self.layers.pop(layer, ()):
+            content = self.chunks[chunk]
+            del content[layer]
+            if not content:
+                del self.chunks[chunk]
+
+    def fill(self, layer: str, items):
+        """Replaces the content of a layer with the given (key, position) items."""
+        self.clear(layer)
+        for key, position in items:
+            self.add(layer, key, position)
+
+    def query(self, layer: str, center: Coord, radius: int) -> list:
+        """(key, position) items of the layer within the square of the given radius around center, sorted by key."""
+        x_min, x_max = max(0, center[0] - radius), min(self.grid_shape[0] - 1, center[0] + radius)
+        y_min, y_max = max(0, center[1] - radius), min(self.grid_shape[1] - 1, center[1] + radius)
+        if x_min > x_max or y_min > y_max:
+            return []
+        (cx_min, cy_min), (cx_max, cy_max) = self.chunk_of((x_min, y_min)), self.chunk_of((x_max, y_max))
+        chunks = self.layers.get(layer, ())
+        found = []
+        for cx in range(cx_min, cx_max + 1):
+            for cy in range(cy_min, cy_max + 1):
+                if (cx, cy) not in chunks:
+                    continue
+                found.extend(
+                    item for item in self.chunks[(cx, cy)][layer].items()
+                    if x_min <= item[1][0] <= x_max and y_min <= item[1][1] <= y_max
+                )
+        found.sort(key=lambda item: item[0])
+        return found
+
+    def any_within(self, layer: str, center: Coord, radius: int) -> bool:
+        """Whether the layer holds anything within the square of the given radius around center."""
+        x_min, x_max = center[0] - radius, center[0] + radius
+        y_min, y_max = center[1] - radius, center[1] + radius
+        (cx_min, cy_min), (cx_max, cy_max) = self.chunk_of((x_min, y_min)), self.chunk_of((x_max, y_max))
+        chunks = self.layers.get(layer, ())
+        for cx in range(cx_min, cx_max + 1):
+            for cy in range(cy_min, cy_max + 1):
+                if (cx, cy) not in chunks:
+                    continue
+                for x, y in self.chunks[(cx, cy)][layer].values():
+                    if x_min <= x <= x_max and y_min <= y <= y_max:
+                        return True
+        return False
+
+    def items(self, layer: str):
+        """All (key, position) items of a layer, in no particular order."""
+        for chunk in self.layers.get(layer, ()):
+            yield from self.chunks[chunk][layer].items()
+
+    def __len__(self):
+        """Number of materialized chunks."""
+        return len(self.chunks)
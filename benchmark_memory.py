@@ -0,0 +1,73 @@
+"""
+Measures the memory used per flower and per agent, against equivalent objects keeping their attributes in a
+per-instance __dict__ and, for agents, their own action space (the layout before models were slotted).
+
+Usage:
+    python benchmark_memory.py [n_objects]
+"""
+import sys
+import tracemalloc
+
+from bee_colonies.agents.bee.social_bee import SocialBee
+from bee_colonies.agents.wasp.greedy_wasp import GreedyWasp
+from bee_colonies.models.flower import Flower
+from bee_colonies.models.spaces import DiscreteActions
+from config import DEFAULT_CONFIG
+
+DEFAULT_N_OBJECTS = 50_000
+
+
+class DictObject:
+    """Same attributes as a slotted object, stored in a __dict__."""
+
+    def __init__(self, attributes: dict):
+        self.__dict__.update(attributes)
+
+
+def slot_values(obj) -> dict:
+    names = [name for cls in type(obj).__mro__ for name in getattr(cls, "__slots__", ())]
+    return {name: getattr(obj, name) for name in names}
+
+
+def measure(factory, n: int) -> float:
+    """Bytes allocated per object created by factory."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory(i) for i in range(n)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return (after - before) / n
+
+
+def is_slotted(obj) -> bool:
+    return type(obj).__module__.startswith("bee_colonies") and not hasattr(obj, "__dict__")
+
+
+def unslotted(factory, own_space: int = None):
+    def create(i):
+        attributes = {
+            name: DictObject(slot_values(value)) if is_slotted(value) else value
+            for name, value in slot_values(factory(i)).items()
+        }
+        if own_space is not None:
+            attributes["action_space"] = DiscreteActions(own_space)
+        return DictObject(attributes)
+    return create
+
+
+def main(n: int):
+    cases = [
+        ("Flower", lambda i: Flower((i, i)), None),
+        ("SocialBee", lambda i: SocialBee(i, config=DEFAULT_CONFIG), SocialBee.action_space.n),
+        ("GreedyWasp", lambda i: GreedyWasp(i, config=DEFAULT_CONFIG), GreedyWasp.action_space.n),
+    ]
+    print(f"{'object':<12}{'before (B)':>12}{'slotted (B)':>14}{'saved':>8}")
+    for name, factory, n_actions in cases:
+        before = measure(unslotted(factory, n_actions), n)
+        slotted = measure(factory, n)
+        print(f"{name:<12}{before:>12.0f}{slotted:>14.0f}{1 - slotted / before:>8.0%}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_N_OBJECTS)
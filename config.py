@@ -1,15 +1,127 @@
 import json
 import os
+from dataclasses import dataclass, field, fields, replace
+from functools import lru_cache
 
 
+Color = tuple[int, int, int]
 
-def read_config(file_path):
+
+@dataclass(frozen=True)
+class Config:
+    """
+    Typed view over a configuration file (see config/base.json).
+    Defaults match config/base.json, so a missing file or key falls back to the base scenario.
+    Instances are immutable; use `override` to derive a config for a single environment.
+    """
+
+    # scenarios
+    num_scenarios: int = 1
+    queen_bee_classes: list[list[str]] = field(default_factory=lambda: [["GreedyQueenBee", "ConsiderateQueenBee"]])
+    bee_classes: list[list[str]] = field(default_factory=lambda: [["SocialBee", "RespectfulBee"]])
+    wasp_class: list[str] = field(default_factory=lambda: ["GreedyWasp"])
+    out_csv_path: list[str] = field(default_factory=lambda: ["out.csv"])
+    seed: int | None = 42
+    grid_shape: list[int] = field(default_factory=lambda: [75, 75])  # width and height, overridden by the layout's
+    n_bees_per_colony: list[int] = field(default_factory=lambda: [20, 20])
+    n_wasps: int = 5
+    flower_prob: float = 0.1
+    vision: int = 3
+    num_flower_clusters: int = 2
+    max_distance_from_cluster: int = 25
+    max_steps: int = 1000
+    timesteps_after_done: int = 5
+    fair_testing: bool = True
+    record_trajectories: bool = False  # agent positions of each step, next to the scenario's csv
+    record_dataset: bool = False  # observations, masks, actions and infos of each step (see bee_colonies/env/dataset.py)
+    dataset_shard_size: int = 100  # steps per dataset shard
+    world_chunk_size: int = 16  # side of the chunks the grid is stored and cached in
+    layout_path: str | None = None  # pre-generated layout folder (see make_layout.py), None to generate flowers
+    terrain_path: str | None = None  # terrain bitmap (see bee_colonies/models/terrain.py), None for an open field
+    info_metrics: list[str] | None = None  # per-colony metrics of the step infos, None for all of them
+    result_cache_dir: str | None = None  # folder of cached scenario results (see result_cache.py), None to always run
+    results_db: str | None = None  # SQLite database the runs are also stored in (see results_db.py)
+
+    # flowers
+    time_to_restore_pollen: int = 5
+    spread_divider: int = 7
+    spread_scale: float = 0.1
+
+    # bees
+    random_walk_intent: int = 3
+    keep_away_from_beehive_distance: int = 5
+    flower_claim_mode: str = "nearest"  # respectful bees: "nearest" or "optimal" (minimum total distance)
+    bee_vision_multiplier: float = 1
+    bee_attack_power: int = 1
+
+    # queen bees
+    queen_bee_vision_multiplier: float = 1
+    keep_ratio_good_health: int = 25
+    keep_ratio_ok_health: int = 15
+    keep_ratio_bad_health: int = 5
+    starting_food_quantity_per_bee: int = 100
+    consumed_food_per_turn_per_bee: int = 1
+    food_quantity_per_pollen: int = 100
+    good_health_threshold: int = 25
+    bad_health_threshold: int = 15
+
+    # wasps
+    wasp_vision_multiplier: float = 2
+    tendency_threshold: int = 10
+    wasp_life_points: int = 50
+    wasp_attack_power: int = 10
+
+    # rewards (see bee_colonies/env/rewards.py)
+    reward_pollen_delivered: float = 1
+    reward_health_delta: float = 1
+    reward_damage_dealt: float = 1
+    reward_damage_received: float = 1
+
+    # rendering
+    tick_rate: int = 60
+    background_color: Color = (0, 100, 0)
+    flower_color: Color = (255, 182, 193)
+    restoring_pollen_flower_color: Color = (88, 57, 39)
+    hive_color: Color = (255, 0, 0)
+    wasp_color: Color = (255, 140, 0)
+    bee_color: Color = (255, 255, 0)
+    terrain_color: Color = (90, 90, 90)
+
+    @classmethod
+    def from_dict(cls, entries: dict) -> "Config":
+        known = {f.name for f in fields(cls)}
+        unknown = set(entries) - known
+        if unknown:
+            raise ValueError(f"Unknown config entries: {', '.join(sorted(unknown))}")
+        entries = {
+            key: tuple(value) if key.endswith("_color") else value
+            for key, value in entries.items()
+        }
+        return cls(**entries)
+
+    def override(self, **changes) -> "Config":
+        """Returns a copy of this config with the given entries replaced."""
+        return replace(self, **changes)
+
+
+def read_config(file_path) -> dict:
     with open(file_path, 'r') as file:
         config = json.load(file)
     return config
 
 
-def get_config():
-    # read environment variable to get the path to the config file
+@lru_cache(maxsize=None)
+def load_config(file_path) -> Config:
+    """Reads and parses a config file once per path."""
+    return Config.from_dict(read_config(file_path))
+
+
+def get_config() -> Config:
+    # read environment variable to get the path to the config file, falling back to the defaults
     config_path = os.getenv('CONFIG_PATH')
-    return read_config(config_path)
+    if config_path is None:
+        return DEFAULT_CONFIG
+    return load_config(os.path.abspath(config_path))
+
+
+DEFAULT_CONFIG = Config()
@@ -1,18 +1,9 @@
-import sys
 import os
+import sys
 from copy import copy
 
-from config import read_config
-
-if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        config_path = sys.argv[1]
-        CONFIG = read_config(config_path)
-        # write config path as env variable
-        os.environ["CONFIG_PATH"] = config_path
-    else:
-        print("Usage: python main.py <config_file_path>")
-
+from config import Config, load_config
+from result_cache import ResultCache, scenario_key
 from bee_colonies.agents.bee.greedy_bee import GreedyBee
 from bee_colonies.agents.bee.respectful_bee import RespectfulBee
 from bee_colonies.agents.bee.social_bee import SocialBee
@@ -21,108 +12,129 @@ from bee_colonies.agents.queen_bee.considerate_queen_bee import ConsiderateQueen
 from bee_colonies.agents.queen_bee.greedy_queen_bee import GreedyQueenBee
 from bee_colonies.agents.wasp.greedy_wasp import GreedyWasp
 from bee_colonies.env.bee_colonies import BeeColonyEnv, configure_seed
+from bee_colonies.env.dataset import DatasetRecorder, dataset_path
+from bee_colonies.env.pool import EnvironmentPool
+from bee_colonies.env.trajectory import TrajectoryRecorder, trajectory_path
+from bee_colonies.models.layout import load_layout
 from bee_colonies.models.agent import Agent
-from pygame import event, QUIT, quit
 import numpy as np
 
 from bee_colonies.models.bee import Bee
 from bee_colonies.models.queen_bee import QueenBee
 from bee_colonies.models.wasp import Wasp
-import pandas as pd
-
-if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        config_path = sys.argv[1]
-        CONFIG = read_config(config_path)
-    else:
-        print("Usage: python main.py <config_file_path>")
-
-SEED = CONFIG["seed"]
-N_BEES_PER_COLONY = tuple(CONFIG["n_bees_per_colony"])
-N_COLONIES = len(N_BEES_PER_COLONY)
-N_WASPS = CONFIG["n_wasps"]
-FLOWER_PROB = CONFIG["flower_prob"]
-VISION = CONFIG["vision"]
-NUM_FLOWER_CLUSTERS = CONFIG["num_flower_clusters"]  # for uniform distribution set clusters to 0
-MAX_DISTANCE_FROM_CLUSTER = CONFIG["max_distance_from_cluster"]
-MAX_STEPS = CONFIG["max_steps"]
-TIMESTEPS_AFTER_DONE = CONFIG["timesteps_after_done"]
-FAIR_TESTING = CONFIG["fair_testing"]
 
 
 def agents_observe(env, observations, masks):
     queen_bees_obs, bees_obs, wasps_obs = observations
+    # dead agents and dormant bees have nothing to observe
     for queen_bee in env.queen_bees:
-        queen_bee.see(queen_bees_obs[queen_bee.id], mask=masks[0][queen_bee.id])
+        if not env.is_asleep(queen_bee):
+            queen_bee.see(queen_bees_obs[queen_bee.id], mask=masks[0][queen_bee.id])
     for colony, colony_bees in enumerate(env.bees_by_colony):
         for bee in colony_bees:
-            bee.see(bees_obs[colony][bee.local_beehive_id], mask=masks[1][colony][bee.local_beehive_id])
+            if not env.is_asleep(bee):
+                bee.see(bees_obs[colony][bee.local_beehive_id], mask=masks[1][colony][bee.local_beehive_id])
     for wasp in env.wasps:
-        wasp.see(wasps_obs[wasp.id], mask=masks[2][wasp.id])
+        if not env.is_asleep(wasp):
+            wasp.see(wasps_obs[wasp.id], mask=masks[2][wasp.id])
 
 
 def compute_actions(env):
-    actions = {
-        queen_bee: queen_bee.action() for queen_bee in env.queen_bees
+    # dead agents and dormant bees would only stay, they are left out
+    agents = env.awake_agents()
+    # agents following the default random policy are sampled in bulk
+    sampled = env.sample_random_actions(agents)
+    return {
+        agent: sampled[agent] if agent in sampled else agent.action() for agent in agents
+    }
+
+
+# infos the csv of a scenario is made of
+CSV_METRICS = ("alive", "dead_count", "food", "health", "presence_in_beehive")
+
+
+def info_row(info):
+    return {
+        'timestep': info['timestep'],
+        'alive_queen1': info['alive'][0],
+        'dead_queen1': info['dead_count'][0],
+        'food_queen1': info['food'][0],
+        'health_queen1': info['health'][0],
+        'presence_queen1': info['presence_in_beehive'][0],
     }
-    actions.update({
-        bee: bee.action() for colony_bees in env.bees_by_colony for bee in colony_bees
-    })
-    actions.update({
-        wasp: wasp.action() for wasp in env.wasps
-    })
-    return actions
 
 
-def run_env(env, filename):
+def run_env(env, filename, config: Config):
+    # rendering and recording dependencies, loaded only when a scenario actually runs
+    import pandas as pd
+    from pygame import event, QUIT
+
     columns = ['timestep', 'alive_queen1', 'dead_queen1', 'food_queen1', 'health_queen1', 'presence_queen1']
     simulation_data = pd.DataFrame(columns=columns)
 
+    # agent positions of every simulated step (fast-forwarded steps are not recorded)
+    recorder = TrajectoryRecorder(trajectory_path(filename)) if config.record_trajectories else None
+    # observations, masks, actions and infos of every simulated step, written in the background
+    dataset = DatasetRecorder(env, dataset_path(filename), config.dataset_shard_size) if config.record_dataset else None
+    if dataset:
+        env = dataset
+
     observations = env.reset()
     masks = env.init_masks()
     agents_observe(env, observations, masks)
+    if recorder:
+        recorder.record(env)
 
     doneFor = 0
-    while doneFor < TIMESTEPS_AFTER_DONE:
-        for e in event.get():
-            if e.type == QUIT:
-                break
+    while doneFor < config.timesteps_after_done:
         print("Step", env.timestep)
 
         actions = compute_actions(env)
         observations, rewards, masks, done, info = env.step(actions)
         print(info)
+        if recorder:
+            recorder.record(env)
 
-        new_row = {
-            'timestep': info['timestep'],
-            'alive_queen1': info['alive'][0],
-            'dead_queen1': info['dead_count'][0],
-            'food_queen1': info['food'][0],
-            'health_queen1': info['health'][0],
-            'presence_queen1': info['presence_in_beehive'][0],
-        }
-
-        simulation_data = simulation_data._append(new_row, ignore_index=True)
+        simulation_data = simulation_data._append(info_row(info), ignore_index=True)
 
         if done:
             doneFor += 1
+            if env.is_quiescent():
+                # every colony collapsed, nothing left to simulate for the remaining timesteps
+                fast_forwarded = env.fast_forward(config.timesteps_after_done - doneFor)
+                if fast_forwarded:
+                    simulation_data = pd.concat(
+                        [simulation_data, pd.DataFrame([info_row(info) for info in fast_forwarded])],
+                        ignore_index=True
+                    )
+                break
         agents_observe(env, observations, masks)
         env.render()
+        for e in event.get():
+            if e.type == QUIT:
+                break
         print('-' * 20)
 
+    if recorder:
+        recorder.close()
+    if dataset:
+        dataset.close()
     # Use the filename parameter to save the DataFrame to a specific file
     simulation_data.to_csv(filename, index=False)
 
 
-def create_scenario(queen_bee_classes, bee_classes, wasp_class) -> BeeColonyEnv:
+def create_scenario(queen_bee_classes, bee_classes, wasp_class, config: Config) -> BeeColonyEnv:
+    n_bees_per_colony = tuple(config.n_bees_per_colony)
+    n_colonies = len(n_bees_per_colony)
     queen_bees: list[QueenBee] = [
         queen_bee_classes[colony](
             id=colony,
             bees=[
-                bee_classes[colony](local_beehive_id=i) for i in range(N_BEES_PER_COLONY[colony])
+                bee_classes[colony](local_beehive_id=i, config=config) for i in range(n_bees_per_colony[colony])
             ],
-            new_bee_class=bee_classes[colony]
-        ) for colony in range(N_COLONIES)
+            new_bee_class=bee_classes[colony],
+            config=config
+        ) for colony in range(n_colonies)
 
     ]
 
@@ -134,19 +146,23 @@ def create_scenario(queen_bee_classes, bee_classes, wasp_class) -> BeeColonyEnv:
         for bee in colony_bees:
             bee.set_queen(queen_bees[colony])
 
-    wasps: list[Wasp] = [wasp_class(i) for i in range(N_WASPS)]
+    wasps: list[Wasp] = [wasp_class(i, config=config) for i in range(config.n_wasps)]
+
+    # a pre-generated layout sets the size of the grid
+    grid_shape = load_layout(config.layout_path).grid_shape if config.layout_path else tuple(config.grid_shape)
 
-    env = BeeColonyEnv(queen_bees, bees, wasps, seed=SEED, grid_shape=(75, 75), n_wasps=N_WASPS,
-                       n_bees_per_colony=N_BEES_PER_COLONY, flower_density=FLOWER_PROB,
-                       num_clusters=NUM_FLOWER_CLUSTERS, max_distance_from_cluster=MAX_DISTANCE_FROM_CLUSTER,
-                       range_of_vision=VISION, max_steps=MAX_STEPS)
+    # for uniform distribution set num_flower_clusters to 0
+    env = BeeColonyEnv(queen_bees, bees, wasps, seed=config.seed, grid_shape=grid_shape, n_wasps=config.n_wasps,
+                       n_bees_per_colony=n_bees_per_colony, flower_density=config.flower_prob,
+                       num_clusters=config.num_flower_clusters, max_distance_from_cluster=config.max_distance_from_cluster,
+                       range_of_vision=config.vision, max_steps=config.max_steps, config=config)
     return env
 
 
-def parse_classes():
-    queen_bee_classes_names = CONFIG["queen_bee_classes"]
+def parse_classes(config: Config):
+    queen_bee_classes_names = config.queen_bee_classes
     queen_bee_classes = []
-    for scenario in range(CONFIG["num_scenarios"]):
+    for scenario in range(config.num_scenarios):
         scenario_classes = []
         for class_name in queen_bee_classes_names[scenario]:
             if class_name == "ConservativeQueenBee":
@@ -157,12 +173,12 @@ def parse_classes():
                 scenario_classes.append(GreedyQueenBee)
             else:
                 print("Unknown queen bee:", class_name)
-                quit()
+                sys.exit(1)
         queen_bee_classes.append(copy(scenario_classes))
 
-    bee_classes_names = CONFIG["bee_classes"]
+    bee_classes_names = config.bee_classes
     bee_classes = []
-    for scenario in range(CONFIG["num_scenarios"]):
+    for scenario in range(config.num_scenarios):
         scenario_classes = []
         for class_name in bee_classes_names[scenario]:
             if class_name == "GreedyBee":
@@ -173,38 +189,65 @@ def parse_classes():
                 scenario_classes.append(SocialBee)
             else:
                 print("Unknown bee:", class_name)
-                quit()
+                sys.exit(1)
         bee_classes.append(copy(scenario_classes))
 
-    wasp_class_names = CONFIG["wasp_class"]
+    wasp_class_names = config.wasp_class
     wasp_classes = []
-    for scenario in range(CONFIG["num_scenarios"]):
+    for scenario in range(config.num_scenarios):
         if wasp_class_names[scenario] == "GreedyWasp":
             wasp_classes.append(GreedyWasp)
         else:
             print("Unknown wasp:", wasp_class_names[scenario])
-            quit()
+            sys.exit(1)
 
     return queen_bee_classes, bee_classes, wasp_classes
 
 
-def main():
-    num_scenarios = CONFIG["num_scenarios"]
-    queen_bee_classes, bee_classes, wasp_class = parse_classes()
+def main(config: Config):
+    if config.info_metrics is not None and not set(CSV_METRICS) <= set(config.info_metrics):
+        raise ValueError(f"info_metrics must include {', '.join(CSV_METRICS)}")
+    num_scenarios = config.num_scenarios
+    queen_bee_classes, bee_classes, wasp_class = parse_classes(config)
     # scenario: ([queen_bee_class1, queen_bee_class2, ..., queen_bee_classN], [bee_class1, bee_class2, ..., bee_classN], wasp_class, filename)
     scenarios = [
-        (queen_bee_classes[scenario], bee_classes[scenario], wasp_class[scenario], CONFIG["out_csv_path"][scenario])
+        (queen_bee_classes[scenario], bee_classes[scenario], wasp_class[scenario], config.out_csv_path[scenario])
         for scenario in range(num_scenarios)
     ]
 
-    for queen_bee_classes, bee_classes, wasp_class, filename in scenarios:
-        env = create_scenario(queen_bee_classes, bee_classes, wasp_class)
-        if FAIR_TESTING:
-            configure_seed(env.seed)
-        run_env(env, filename)
-        env.close()
+    # unchanged scenarios are served from the result cache instead of being simulated again
+    cache = ResultCache(config.result_cache_dir) if config.result_cache_dir else None
+    if config.results_db:
+        from results_db import ResultsStore, run_metadata
+        store = ResultsStore(config.results_db)
+    # scenarios repeating the classes of an earlier one reuse its environment
+    pool = EnvironmentPool(create_scenario)
+
+    for scenario, (queen_bee_classes, bee_classes, wasp_class, filename) in enumerate(scenarios):
+        # datasets are not cached: scenarios recording one always run
+        key = scenario_key(config, scenario) if cache and not config.record_dataset else None
+        if key and cache.fetch(key, filename, config.record_trajectories):
+            print("Cached", filename)
+        else:
+            env = pool.acquire(queen_bee_classes, bee_classes, wasp_class, config)
+            if config.fair_testing:
+                configure_seed(env.seed)
+            run_env(env, filename, config)
+            pool.release(env)
+            if key:
+                cache.store(key, filename, config.record_trajectories)
+        if config.results_db:
+            experiment = os.path.basename(os.path.dirname(os.path.abspath(filename)))
+            store.import_csv(filename, experiment, run_metadata(config, scenario), replace=True)
+
+    pool.close()
+    if config.results_db:
+        store.close()
 
 
 if __name__ == "__main__":
-    main()
-    quit()
+    if len(sys.argv) > 1:
+        main(load_config(sys.argv[1]))
+    else:
+        print("Usage: python main.py <config_file_path>")
+        sys.exit(1)
@@ -0,0 +1,45 @@
+"""
+Pre-generates the flower layout of a configuration once, for environments to load it in constant time.
+
+Usage:
+    python make_layout.py <config.json> <layout_dir> [width height]
+
+The layout is generated the same way the environment does (flower clusters, density and spread of the config, seeded
+with its seed) on a width x height grid (the config's grid_shape by default), and written as memory-mapped files.
+Set "layout_path": "<layout_dir>" in a config to use it; the grid then takes the layout's shape.
+"""
+import sys
+
+import numpy as np
+
+from bee_colonies.models.flower import generate_flowers, generate_uniform_flowers
+from bee_colonies.models.layout import save_layout
+from config import Config, load_config
+
+
+def make_layout(config: Config, path: str, grid_shape=None):
+    grid_shape = tuple(grid_shape or config.grid_shape)
+    if config.seed is not None:
+        np.random.seed(config.seed)
+    clusters = []
+    if config.num_flower_clusters == 0:
+        flower_coordinates = generate_uniform_flowers(grid_shape, config.flower_prob)
+    else:
+        clusters = [
+            (np.random.randint(0, grid_shape[0]), np.random.randint(0, grid_shape[1]))
+            for _ in range(config.num_flower_clusters)
+        ]
+        flower_coordinates = generate_flowers(grid_shape, config.flower_prob, tuple(clusters),
+                                              config.spread_divider, config.spread_scale)
+    save_layout(path, grid_shape, clusters, flower_coordinates)
+    return len(flower_coordinates)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (3, 5):
+        print("Usage: python make_layout.py <config.json> <layout_dir> [width height]")
+        sys.exit(1)
+    config = load_config(sys.argv[1])
+    grid_shape = (int(sys.argv[3]), int(sys.argv[4])) if len(sys.argv) == 5 else tuple(config.grid_shape)
+    n_flowers = make_layout(config, sys.argv[2], grid_shape)
+    print(f"Wrote {n_flowers} flowers on a {grid_shape[0]}x{grid_shape[1]} grid to {sys.argv[2]}")
@@ -1,80 +1,160 @@
+"""
+Renders the standard charts of each experiment folder listed in a sweep manifest.
+
+Usage:
+    python plot.py [<manifest.json>] [--workers N]
+    python plot.py --summary <out_dir> <summary1.csv> [<summary2.csv> ...]
+
+The manifest (see plots/plots.json) lists experiment folders:
+    {
+        "downsample": 5,
+        "experiments": [
+            {"data": "data/data_scarsity_I"},
+            {"data": "data/data_impact_predation", "runs": ["40_wasps_min_dist_15_greedy_respectful.csv"]},
+            {"data": "data/aggregated", "plots": "plots/plots_aggregated", "summary": true}
+        ]
+    }
+By default every CSV of `data` is plotted into the matching `plots/plots_*` folder.
+"""
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-
-# File names
-filenames = [
-    #'data_impact_predation/greedy_greedy.csv', 
-    #'data_impact_predation/greedy_respectful.csv', 
-    #'data_impact_predation/greedy_social.csv', 
-    #'data_impact_predation/conservative_greedy.csv', 
-    #'data_impact_predation/conservative_respectful.csv', 
-    #'data_impact_predation/conservative_social.csv',
-    #'data_impact_predation/considerate_greedy.csv',
-    #'data_impact_predation/considerate_respectful.csv',
-    #'data_impact_predation/considerate_social.csv',
-    'data/data_impact_predation/40_wasps_min_dist_15_considerate_respectful.csv',
-    'data/data_impact_predation/40_wasps_min_dist_15_greedy_respectful.csv',
+
+DEFAULT_MANIFEST = 'plots/plots.json'
+DEFAULT_DOWNSAMPLE = 5
+
+# (column, title, y label, output file)
+CHARTS = [
+    ('alive_queen1', 'Number of Alive Bees in Queen Bee Over Time by Scenario', 'Number of Alive Bees in Queen Bee',
+     'num_alive_bees.png'),
+    ('dead_queen1', 'Number of Dead Bees in Queen Bee Over Time by Scenario', 'Number of Dead Bees in Queen Bee',
+     'num_dead_bees.png'),
+    ('food_queen1', 'Food Stored in Queen Bee Over Time by Scenario', 'Food Stored in Queen Bee',
+     'food_stored.png'),
+    ('health_queen1', 'Health of Queen Bee Over Time by Scenario', 'Health of Queen Bee',
+     'health.png'),
+    ('presence_queen1', 'Number of Bees Present in Queen Bee Over Time by Scenario',
+     'Number of Bees Present in Queen Bee', 'num_bees_present.png'),
 ]
+RUN_DTYPES = {'timestep': 'int32', **{column: 'float32' for column, *_ in CHARTS}}
+
+
+def scenario_name(file):
+    return os.path.basename(file).replace('_summary', '').replace('.csv', '')
+
+
+def read_runs(filenames, downsample=DEFAULT_DOWNSAMPLE):
+    """Reads only the charted columns of each run, keeping every `downsample`-th timestep."""
+    dataframes = []
+    for file in filenames:
+        df = pd.read_csv(file, usecols=list(RUN_DTYPES), dtype=RUN_DTYPES)
+        df = df[df['timestep'].to_numpy() % downsample == 0]
+        df['scenario'] = scenario_name(file)
+        dataframes.append(df)
+    combined_data = pd.concat(dataframes, ignore_index=True)
+    combined_data['scenario'] = combined_data['scenario'].astype('category')
+    return combined_data
+
+
+def _new_chart():
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    plt.figure(figsize=(12, 8))
+    return plt
+
+
+def _save_chart(plt, title, ylabel, out_path):
+    plt.title(title)
+    plt.xlabel('Timestep')
+    plt.ylabel(ylabel)
+    plt.legend(title='Scenario')
+    plt.grid(True)
+    plt.savefig(out_path)
+    plt.close()
+
+
+def plot_runs(filenames, out_dir, downsample=DEFAULT_DOWNSAMPLE, suffix=''):
+    """One line per run file."""
+    import seaborn as sns
+
+    combined_data = read_runs(filenames, downsample)
+    for column, title, ylabel, out_file in CHARTS:
+        plt = _new_chart()
+        sns.lineplot(data=combined_data, x='timestep', y=column, hue='scenario', style='scenario', markers=False)
+        _save_chart(plt, title, ylabel, os.path.join(out_dir, _with_suffix(out_file, suffix)))
+
+
+def plot_summaries(filenames, out_dir, band=('q05', 'q95'), suffix=''):
+    """
+    One mean line per summary file written by aggregate.py, with a confidence band between the given quantiles.
+    Use band=None for mean +/- one standard deviation.
+    """
+    summaries = {scenario_name(file): pd.read_csv(file) for file in filenames}
+
+    for column, title, ylabel, out_file in CHARTS:
+        plt = _new_chart()
+        for scenario, summary in summaries.items():
+            if f'{column}_mean' not in summary:
+                continue
+            mean = summary[f'{column}_mean']
+            if band is None:
+                low, high = mean - summary[f'{column}_std'], mean + summary[f'{column}_std']
+            else:
+                low, high = summary[f'{column}_{band[0]}'], summary[f'{column}_{band[1]}']
+            line, = plt.plot(summary['timestep'], mean, label=scenario)
+            plt.fill_between(summary['timestep'], low, high, color=line.get_color(), alpha=0.2)
+        _save_chart(plt, title, ylabel, os.path.join(out_dir, _with_suffix(out_file, suffix)))
+
+
+def plot_experiment(experiment: dict, downsample=DEFAULT_DOWNSAMPLE) -> str:
+    """Renders the charts of one manifest entry, returns the output folder."""
+    data_dir = experiment['data']
+    out_dir = experiment.get('plots') or default_plots_dir(data_dir)
+    runs = experiment.get('runs') or sorted(file for file in os.listdir(data_dir) if file.endswith('.csv'))
+    filenames = [os.path.join(data_dir, run) for run in runs]
+    os.makedirs(out_dir, exist_ok=True)
+    if experiment.get('summary', False):
+        plot_summaries(filenames, out_dir, suffix=experiment.get('suffix', ''))
+    else:
+        plot_runs(filenames, out_dir, experiment.get('downsample', downsample), experiment.get('suffix', ''))
+    return out_dir
+
+
+def plot_manifest(manifest_path=DEFAULT_MANIFEST, workers=None):
+    with open(manifest_path, 'r') as file:
+        manifest = json.load(file)
+    downsample = manifest.get('downsample', DEFAULT_DOWNSAMPLE)
+    experiments = manifest['experiments']
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for out_dir in executor.map(plot_experiment, experiments, [downsample] * len(experiments)):
+            print('Plotted', out_dir)
+
+
+def default_plots_dir(data_dir):
+    """data/data_<experiment> -> plots/plots_<experiment>"""
+    name = os.path.basename(os.path.normpath(data_dir))
+    if name.startswith('data_'):
+        name = 'plots_' + name[len('data_'):]
+    return os.path.join('plots', name)
+
+
+def _with_suffix(out_file, suffix):
+    name, extension = os.path.splitext(out_file)
+    return f'{name}{suffix}{extension}'
+
 
-# Read each file and add a scenario label
-dataframes = []
-for file in filenames:
-    df = pd.read_csv(file)
-    df = df[df['timestep'] % 5 == 0]  # Filter to keep only rows where timestep is a multiple of 10
-    df['scenario'] = file.replace('data/data_impact_predation/', '').replace('.csv', '')  # Add scenario as a column with simplified names
-    dataframes.append(df)
-
-# Concatenate all dataframes into one
-combined_data = pd.concat(dataframes, ignore_index=True)
-
-
-plt.figure(figsize=(12, 8))
-sns.lineplot(data=combined_data, x='timestep', y='alive_queen1', hue='scenario', style='scenario', markers=False)
-plt.title('Number of Alive Bees in Queen Bee Over Time by Scenario')
-plt.xlabel('Timestep')
-plt.ylabel('Number of Alive Bees in Queen Bee')
-plt.legend(title='Scenario')
-plt.grid(True)
-plt.savefig('plots/plots_impact_predation/num_alive_bees.png')
-plt.close()
-
-plt.figure(figsize=(12, 8))
-sns.lineplot(data=combined_data, x='timestep', y='dead_queen1', hue='scenario', style='scenario', markers=False)
-plt.title('Number of Dead Bees in Queen Bee Over Time by Scenario')
-plt.xlabel('Timestep')
-plt.ylabel('Number of Dead Bees in Queen Bee')
-plt.legend(title='Scenario')
-plt.grid(True)
-plt.savefig('plots/plots_impact_predation/num_dead_bees.png')
-plt.close()
-
-plt.figure(figsize=(12, 8))
-sns.lineplot(data=combined_data, x='timestep', y='food_queen1', hue='scenario', style='scenario', markers=False)
-plt.title('Food Stored in Queen Bee Over Time by Scenario')
-plt.xlabel('Timestep')
-plt.ylabel('Food Stored in Queen Bee')
-plt.legend(title='Scenario')
-plt.grid(True)
-plt.savefig('plots/plots_impact_predation/food_stored.png')
-plt.close()
-
-plt.figure(figsize=(12, 8))
-sns.lineplot(data=combined_data, x='timestep', y='health_queen1', hue='scenario', style='scenario', markers=False)
-plt.title('Health of Queen Bee Over Time by Scenario')
-plt.xlabel('Timestep')
-plt.ylabel('Health of Queen Bee')
-plt.legend(title='Scenario')
-plt.grid(True)
-plt.savefig('plots/plots_impact_predation/health.png')
-plt.close()
-
-plt.figure(figsize=(12, 8))
-sns.lineplot(data=combined_data, x='timestep', y='presence_queen1', hue='scenario', style='scenario', markers=False)
-plt.title('Number of Bees Present in Queen Bee Over Time by Scenario')
-plt.xlabel('Timestep')
-plt.ylabel('Number of Bees Present in Queen Bee')
-plt.legend(title='Scenario')
-plt.grid(True)
-plt.savefig('plots/plots_impact_predation/num_bees_present.png')
-plt.close()
\ No newline at end of file
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    if len(args) > 2 and args[0] == '--summary':
+        plot_summaries(args[2:], args[1])
+    else:
+        workers = None
+        if '--workers' in args:
+            index = args.index('--workers')
+            workers = int(args[index + 1])
+            del args[index:index + 2]
+        plot_manifest(args[0] if args else DEFAULT_MANIFEST, workers)
@@ -0,0 +1,123 @@
+"""
+On-disk cache of scenario results, addressed by the content of everything that determines them.
+
+The key of a scenario hashes:
+- its resolved config: the scenario's own classes and every tunable, but not the output path or rendering entries
+- the content of the terrain and layout files it reads
+- a fingerprint of the simulation code (every .py file of bee_colonies, main.py and config.py)
+
+Runs are deterministic given their seed, so a scenario whose key is already cached is served by copying the cached
+csv (and trajectory) instead of being simulated again. Scenarios without a seed are never cached.
+"""
+import hashlib
+import json
+import os
+import shutil
+from dataclasses import asdict
+from functools import lru_cache
+
+from bee_colonies.env.trajectory import trajectory_path
+from config import Config
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+CODE_PATHS = ("bee_colonies", "main.py", "config.py")
+
+# entries that do not change the results of a scenario
+SCENARIO_LISTS = ("queen_bee_classes", "bee_classes", "wasp_class")
+IGNORED_ENTRIES = {"num_scenarios", "out_csv_path", "result_cache_dir", "results_db", "tick_rate"}
+
+
+def _hash_file(digest, file_path: str):
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+
+
+@lru_cache(maxsize=None)
+def code_fingerprint(root: str = ROOT) -> str:
+    """Hash of the simulation code, computed once per process."""
+    digest = hashlib.sha256()
+    for code_path in CODE_PATHS:
+        full_path = os.path.join(root, code_path)
+        if os.path.isfile(full_path):
+            files = [full_path]
+        else:
+            files = sorted(
+                os.path.join(directory, name)
+                for directory, _, names in os.walk(full_path) for name in names if name.endswith(".py")
+            )
+        for file_path in files:
+            digest.update(os.path.relpath(file_path, root).encode())
+            _hash_file(digest, file_path)
+    return digest.hexdigest()
+
+
+def _input_fingerprint(path: str | None) -> str | None:
+    """Hash of a terrain file or of a layout folder, so editing them in place invalidates the cache."""
+    if path is None:
+        return None
+    digest = hashlib.sha256()
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            digest.update(name.encode())
+            _hash_file(digest, os.path.join(path, name))
+    else:
+        _hash_file(digest, path)
+    return digest.hexdigest()
+
+
+def scenario_entries(config: Config, scenario: int) -> dict:
+    """The config as seen by one scenario."""
+    entries = {
+        key: value for key, value in asdict(config).items()
+        if key not in IGNORED_ENTRIES and not key.endswith("_color")
+    }
+    for key in SCENARIO_LISTS:
+        entries[key] = entries[key][scenario]
+    return entries
+
+
+def scenario_key(config: Config, scenario: int) -> str | None:
+    """
+    Content address of a scenario's results, None when they cannot be cached (no seed).
+    Every environment is seeded when it is built or reused, so a scenario does not depend on the ones run before it.
+    """
+    if config.seed is None:
+        return None
+    content = {
+        "config": scenario_entries(config, scenario),
+        "terrain": _input_fingerprint(config.terrain_path),
+        "layout": _input_fingerprint(config.layout_path),
+        "code": code_fingerprint(),
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+
+class ResultCache:
+    """Folder of cached csv files named after their key, with their trajectory next to them when recorded."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.csv")
+
+    def fetch(self, key: str, filename: str, with_trajectory: bool = False) -> bool:
+        """Copies the cached results of key to filename. Returns whether they were cached."""
+        cached = self.path(key)
+        if not os.path.exists(cached) or (with_trajectory and not os.path.exists(trajectory_path(cached))):
+            return False
+        shutil.copyfile(cached, filename)
+        if with_trajectory:
+            shutil.copyfile(trajectory_path(cached), trajectory_path(filename))
+        return True
+
+    def store(self, key: str, filename: str, with_trajectory: bool = False):
+        """Adds the results just written to filename; the csv is moved in last, so partial entries are never hit."""
+        cached = self.path(key)
+        if with_trajectory:
+            shutil.copyfile(trajectory_path(filename), trajectory_path(cached))
+        temporary = f"{cached}.tmp"
+        shutil.copyfile(filename, temporary)
+        os.replace(temporary, cached)
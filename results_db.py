@@ -0,0 +1,191 @@
+"""
+SQLite store of simulation runs: one row of metadata per run and the per-step metrics of every run in one table,
+indexed by (run_id, timestep), so cross-scenario queries are indexed lookups instead of globbing csv files.
+
+Usage:
+    python results_db.py <results.db> [<data_dir>]
+
+Imports every csv of <data_dir> (default: data), one experiment per sub-folder. Run parameters are read from the
+file names (e.g. 40_wasps_min_dist_15_considerate_respectful.csv); files already imported are skipped.
+main.py adds its runs directly, with their full config, when `results_db` is set.
+"""
+import csv
+import json
+import os
+import re
+import sqlite3
+import sys
+
+DEFAULT_DATA_DIR = "data"
+
+# per-step metrics, named as the columns of the scenario csv files
+METRIC_COLUMNS = ("alive_queen1", "dead_queen1", "food_queen1", "health_queen1", "presence_queen1")
+RUN_COLUMNS = ("experiment", "name", "source", "queen_class", "bee_class", "wasp_class", "seed", "n_wasps",
+               "min_distance", "flower_prob", "config")
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    experiment TEXT NOT NULL,
+    name TEXT NOT NULL,
+    source TEXT UNIQUE,
+    queen_class TEXT,
+    bee_class TEXT,
+    wasp_class TEXT,
+    seed INTEGER,
+    n_wasps INTEGER,
+    min_distance INTEGER,
+    flower_prob REAL,
+    config TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_experiment ON runs (experiment);
+CREATE INDEX IF NOT EXISTS runs_classes ON runs (queen_class, bee_class);
+CREATE TABLE IF NOT EXISTS steps (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    timestep INTEGER NOT NULL,
+    {", ".join(f"{column} INTEGER" for column in METRIC_COLUMNS)},
+    PRIMARY KEY (run_id, timestep)
+) WITHOUT ROWID;
+"""
+
+QUEEN_CLASSES = {"conservative": "ConservativeQueenBee", "considerate": "ConsiderateQueenBee",
+                 "greedy": "GreedyQueenBee"}
+BEE_CLASSES = {"greedy": "GreedyBee", "respectful": "RespectfulBee", "social": "SocialBee"}
+RUN_NAME = re.compile(
+    r"^(?:(?P<n_wasps>\d+)_wasps_)?(?:min_dist_(?P<min_distance>\d+)_)?"
+    rf"(?P<queen>{'|'.join(QUEEN_CLASSES)})_(?P<bee>{'|'.join(BEE_CLASSES)})$"
+)
+
+
+def parse_run_name(name: str) -> dict:
+    """Parameters encoded in the name of a csv file; names following no known pattern give none."""
+    match = RUN_NAME.match(name)
+    if match is None:
+        return {}
+    return {
+        "queen_class": QUEEN_CLASSES[match["queen"]],
+        "bee_class": BEE_CLASSES[match["bee"]],
+        "n_wasps": int(match["n_wasps"]) if match["n_wasps"] else None,
+        "min_distance": int(match["min_distance"]) if match["min_distance"] else None,
+    }
+
+
+class ResultsStore:
+    def __init__(self, path: str):
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def add_run(self, metadata: dict, rows) -> int:
+        """
+        Adds a run and its steps in one transaction. rows are (timestep, *METRIC_COLUMNS) sequences.
+        Returns the id of the run.
+        """
+        with self.connection:
+            cursor = self.connection.execute(
+                f"INSERT INTO runs ({', '.join(RUN_COLUMNS)}) VALUES ({', '.join('?' * len(RUN_COLUMNS))})",
+                [metadata.get(column) for column in RUN_COLUMNS]
+            )
+            run_id = cursor.lastrowid
+            self.connection.executemany(
+                f"INSERT INTO steps VALUES ({', '.join('?' * (len(METRIC_COLUMNS) + 2))})",
+                ((run_id, *row) for row in rows)
+            )
+        return run_id
+
+    def has_source(self, source: str) -> bool:
+        return self.connection.execute("SELECT 1 FROM runs WHERE source = ?", (source,)).fetchone() is not None
+
+    def remove_source(self, source: str):
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM steps WHERE run_id IN (SELECT run_id FROM runs WHERE source = ?)", (source,)
+            )
+            self.connection.execute("DELETE FROM runs WHERE source = ?", (source,))
+
+    def import_csv(self, file_path: str, experiment: str, metadata: dict = None, replace: bool = False) -> int | None:
+        """
+        Adds the run of a scenario csv. A file already imported is skipped (None is returned),
+        or its run replaced when `replace` is set.
+        """
+        source = os.path.abspath(file_path)
+        if self.has_source(source):
+            if not replace:
+                return None
+            self.remove_source(source)
+        name = os.path.splitext(os.path.basename(file_path))[0]
+        with open(file_path, newline="") as file:
+            reader = csv.reader(file)
+            header = next(reader)
+            indices = [header.index(column) for column in ("timestep", *METRIC_COLUMNS)]
+            rows = ([row[index] for index in indices] for row in reader)
+            return self.add_run({
+                "experiment": experiment, "name": name, "source": source,
+                **parse_run_name(name), **(metadata or {}),
+            }, rows)
+
+    def import_folder(self, data_dir: str = DEFAULT_DATA_DIR) -> int:
+        """Imports the csv files of each experiment folder. Returns the number of runs added."""
+        added = 0
+        for experiment in sorted(os.listdir(data_dir)):
+            folder = os.path.join(data_dir, experiment)
+            if not os.path.isdir(folder):
+                continue
+            for file_name in sorted(os.listdir(folder)):
+                if file_name.endswith(".csv") and self.import_csv(os.path.join(folder, file_name), experiment):
+                    added += 1
+        return added
+
+    def runs(self, **filters) -> list[sqlite3.Row]:
+        """Runs whose metadata equals the given values, e.g. runs(experiment="data_scarsity_I")."""
+        unknown = set(filters) - set(RUN_COLUMNS) - {"run_id"}
+        if unknown:
+            raise ValueError(f"Unknown run columns: {', '.join(sorted(unknown))}")
+        where = " AND ".join(f"{column} = ?" for column in filters) or "1"
+        cursor = self.connection.execute(f"SELECT * FROM runs WHERE {where} ORDER BY run_id", list(filters.values()))
+        cursor.row_factory = sqlite3.Row
+        return cursor.fetchall()
+
+    def steps(self, run_id: int, start: int = None, end: int = None) -> list[tuple]:
+        """(timestep, *METRIC_COLUMNS) rows of a run, optionally limited to timesteps in [start, end)."""
+        return self.connection.execute(
+            f"SELECT timestep, {', '.join(METRIC_COLUMNS)} FROM steps "
+            "WHERE run_id = ? AND timestep >= ? AND timestep < ? ORDER BY timestep",
+            (run_id, start if start is not None else -1, end if end is not None else sys.maxsize)
+        ).fetchall()
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def run_metadata(config, scenario: int) -> dict:
+    """Metadata of a run simulated by main.py from the given scenario of config."""
+    from result_cache import scenario_entries
+
+    return {
+        "queen_class": config.queen_bee_classes[scenario][0],
+        "bee_class": config.bee_classes[scenario][0],
+        "wasp_class": config.wasp_class[scenario],
+        "seed": config.seed,
+        "n_wasps": config.n_wasps,
+        "flower_prob": config.flower_prob,
+        "config": json.dumps(scenario_entries(config, scenario)),
+    }
+
+
+def main(db_path: str, data_dir: str = DEFAULT_DATA_DIR):
+    with ResultsStore(db_path) as store:
+        added = store.import_folder(data_dir)
+    print(f"Imported {added} runs into {db_path}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python results_db.py <results.db> [<data_dir>]")
+        sys.exit(1)
+    main(*sys.argv[1:3])
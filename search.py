@@ -0,0 +1,130 @@
+"""
+Successive-halving search over colony tunables.
+
+Samples configurations of SEARCH_SPACE and runs them in parallel for a short horizon. Only the best 1/eta of them
+are kept for the next rung, which runs eta times longer over eta times more seeds. This repeats until the horizon
+reaches the config's max_steps. Configurations are scored on colony health, so poor performers are pruned from
+partial episodes instead of full runs.
+
+Each configuration is a Config derived with `override` and sent to the workers as is, without temporary files.
+
+Usage:
+    python search.py <config_file_path> [--configs N] [--eta ETA] [--min-steps STEPS] [--workers N] [--out results.json]
+
+Scenario 0 of the config is searched; its max_steps is the horizon of the last rung.
+"""
+import json
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from config import Config, load_config
+from main import agents_observe, compute_actions, create_scenario, parse_classes
+from bee_colonies.env.bee_colonies import configure_seed
+from bee_colonies.env.pool import EnvironmentPool
+from bee_colonies.models.queen_bee import HEALTH_SCORE_FUNCTION
+
+# tunable -> (low, high), both included
+SEARCH_SPACE = {
+    "keep_ratio_good_health": (10, 40),
+    "keep_ratio_ok_health": (5, 30),
+    "keep_ratio_bad_health": (1, 15),
+    "tendency_threshold": (3, 20),
+    "random_walk_intent": (1, 6),
+    "keep_away_from_beehive_distance": (2, 10),
+}
+KEEP_RATIOS = ("keep_ratio_good_health", "keep_ratio_ok_health", "keep_ratio_bad_health")
+
+DEFAULT_N_CONFIGS = 27
+DEFAULT_ETA = 3
+DEFAULT_MIN_STEPS = 100
+
+
+def sample_overrides(rng: random.Random) -> dict:
+    overrides = {name: rng.randint(low, high) for name, (low, high) in SEARCH_SPACE.items()}
+    # a healthier colony keeps a larger share of its bees home
+    ratios = sorted((overrides[name] for name in KEEP_RATIOS), reverse=True)
+    overrides.update(zip(KEEP_RATIOS, ratios))
+    return overrides
+
+
+# environments of each worker process, reused across the seeds of a configuration
+_pool = EnvironmentPool(create_scenario)
+
+
+def colony_health(config: Config) -> float:
+    """Mean health of the colonies when the episode ends or reaches max_steps; collapsed colonies score 0."""
+    queen_bee_classes, bee_classes, wasp_class = parse_classes(config)
+    env = _pool.acquire(queen_bee_classes[0], bee_classes[0], wasp_class[0], config)
+    if config.fair_testing:
+        configure_seed(env.seed)
+    observations = env.reset()
+    agents_observe(env, observations, env.init_masks())
+    done = False
+    while not done:
+        observations, rewards, masks, done, info = env.step(compute_actions(env))
+        agents_observe(env, observations, masks)
+    health = sum(
+        HEALTH_SCORE_FUNCTION(queen.food_quantity, queen.alive_bees) if queen.is_alive else 0
+        for queen in env.queen_bees
+    ) / len(env.queen_bees)
+    _pool.release(env)
+    return health
+
+
+def successive_halving(config: Config, n_configs=DEFAULT_N_CONFIGS, eta=DEFAULT_ETA, min_steps=DEFAULT_MIN_STEPS,
+                       workers=None) -> list[tuple[float, dict]]:
+    """Returns the (score, overrides) of the configurations that reached the last rung, best first."""
+    rng = random.Random(config.seed)
+    candidates = [sample_overrides(rng) for _ in range(n_configs)]
+    base_seed = config.seed if config.seed is not None else 0
+    steps, n_seeds = min(min_steps, config.max_steps), 1
+    # scenario 0 only, with the metrics the score needs
+    base = config.override(num_scenarios=1, info_metrics=["alive", "food", "health"])
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while True:
+            runs = [
+                base.override(**overrides, max_steps=steps, seed=base_seed + seed)
+                for overrides in candidates for seed in range(n_seeds)
+            ]
+            healths = list(executor.map(colony_health, runs))
+            scores = [sum(healths[i * n_seeds:(i + 1) * n_seeds]) / n_seeds for i in range(len(candidates))]
+            ranked = sorted(zip(scores, candidates), key=lambda result: result[0], reverse=True)
+            print(f"{steps} steps x {n_seeds} seeds: {len(candidates)} configurations, best {ranked[0][0]:.1f}")
+            if steps >= config.max_steps or len(candidates) == 1:
+                return ranked
+            candidates = [overrides for _, overrides in ranked[:max(1, len(ranked) // eta)]]
+            steps, n_seeds = min(steps * eta, config.max_steps), n_seeds * eta
+
+
+def main(config: Config, n_configs=DEFAULT_N_CONFIGS, eta=DEFAULT_ETA, min_steps=DEFAULT_MIN_STEPS,
+         workers=None, out_path=None):
+    ranked = successive_halving(config, n_configs, eta, min_steps, workers)
+    for score, overrides in ranked:
+        print(f"{score:8.1f}  {overrides}")
+    if out_path:
+        with open(out_path, "w") as file:
+            json.dump([{"score": score, **overrides} for score, overrides in ranked], file, indent=4)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    options = {"--configs": DEFAULT_N_CONFIGS, "--eta": DEFAULT_ETA, "--min-steps": DEFAULT_MIN_STEPS,
+               "--workers": None, "--out": None}
+    for option in options:
+        if option in args:
+            index = args.index(option)
+            options[option] = args[index + 1]
+            del args[index:index + 2]
+    if not args:
+        print(__doc__)
+        sys.exit(1)
+    main(
+        load_config(args[0]),
+        n_configs=int(options["--configs"]),
+        eta=int(options["--eta"]),
+        min_steps=int(options["--min-steps"]),
+        workers=int(options["--workers"]) if options["--workers"] else None,
+        out_path=options["--out"],
+    )
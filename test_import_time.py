@@ -0,0 +1,91 @@
+"""
+Import checks of the simulation, runnable with pytest or as a script.
+
+Simulation workers must not load rendering, recording or pettingzoo dependencies when importing the simulation,
+and importing it must stay cheap. Import time depends on the machine, so it is measured relative to importing
+numpy alone in the same run, and is allowed IMPORT_TIME_RATIO times as long (the IMPORT_TIME_RATIO environment
+variable overrides it).
+
+Usage:
+    python -m pytest test_import_time.py
+    python test_import_time.py [ratio]
+"""
+import os
+import subprocess
+import sys
+
+# Modules a simulation worker imports, and the heavy dependencies they must not pull in.
+MODULES = [
+    "main",
+    "bee_colonies.env.bee_colonies",
+    "bee_colonies.agents.bee.greedy_bee",
+    "bee_colonies.agents.bee.respectful_bee",
+    "bee_colonies.agents.bee.social_bee",
+    "bee_colonies.agents.queen_bee.conservative_queen_bee",
+    "bee_colonies.agents.queen_bee.considerate_queen_bee",
+    "bee_colonies.agents.queen_bee.greedy_queen_bee",
+    "bee_colonies.agents.wasp.greedy_wasp",
+]
+LAZY_DEPENDENCIES = ["pygame", "pandas", "pettingzoo", "gym", "gymnasium", "matplotlib", "seaborn"]
+REFERENCE_MODULES = ["numpy"]
+IMPORT_TIME_RATIO = float(os.environ.get("IMPORT_TIME_RATIO", 3))
+# runs per measurement, the fastest is kept to smooth out a busy machine
+REPEATS = 3
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def measure_import_time(modules: list[str]) -> tuple[float, set[str]]:
+    """
+    Imports the modules in a fresh interpreter with `python -X importtime`.
+    Returns the total import time in milliseconds and the names of every imported module.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "; ".join(f"import {module}" for module in modules)],
+        capture_output=True, text=True, check=True, cwd=ROOT
+    )
+    total_us = 0
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        imported.add(name.strip())
+        if not name.startswith("  "):  # top-level import, its cumulative time includes its dependencies
+            total_us += int(cumulative)
+    return total_us / 1000, imported
+
+
+def fastest_import_time(modules: list[str]) -> float:
+    return min(measure_import_time(modules)[0] for _ in range(REPEATS))
+
+
+def test_lazy_dependencies_not_imported():
+    _, imported = measure_import_time(MODULES)
+    loaded = [dependency for dependency in LAZY_DEPENDENCIES if dependency in imported]
+    assert not loaded, f"loaded at import, should be lazy: {', '.join(loaded)}"
+
+
+def test_import_time_relative_to_numpy():
+    reference_ms = fastest_import_time(REFERENCE_MODULES)
+    total_ms = fastest_import_time(MODULES)
+    assert total_ms <= IMPORT_TIME_RATIO * reference_ms, \
+        f"import time {total_ms:.1f} ms, over {IMPORT_TIME_RATIO} x numpy ({reference_ms:.1f} ms)"
+
+
+def main(ratio: float = IMPORT_TIME_RATIO) -> int:
+    reference_ms = fastest_import_time(REFERENCE_MODULES)
+    total_ms = fastest_import_time(MODULES)
+    _, imported = measure_import_time(MODULES)
+    loaded = [dependency for dependency in LAZY_DEPENDENCIES if dependency in imported]
+    print(f"import time: {total_ms:.1f} ms, {total_ms / reference_ms:.2f} x numpy ({reference_ms:.1f} ms), "
+          f"budget {ratio} x")
+    if loaded:
+        print("loaded at import, should be lazy:", ", ".join(loaded))
+    if total_ms > ratio * reference_ms:
+        print("import time over budget")
+    return 1 if loaded or total_ms > ratio * reference_ms else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(float(sys.argv[1]) if len(sys.argv) > 1 else IMPORT_TIME_RATIO))